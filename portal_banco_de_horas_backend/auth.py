@@ -1,17 +1,124 @@
 # Ficheiro: auth.py
 # (Versão Completa com Proteção de Admin)
 
+import time
+from datetime import datetime, timezone
+
+import jwt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyHeader 
 from supabase_client import supabase
-from gotrue.errors import AuthApiError
-from gotrue.types import User as AuthUser
+from supabase_auth.errors import AuthApiError
+from supabase_auth.types import User as AuthUser
 from models import Profile # Importa o modelo de Perfil
+from settings import settings
+from cache import TTLCache
+import metrics
 from uuid import UUID
 
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
-def get_current_user(token: str = Depends(api_key_header)) -> AuthUser:
+# Tokens já verificados -> utilizador (evita voltar a verificar o mesmo JWT)
+_token_cache = TTLCache("auth_tokens", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# Perfis já lidos -> dados do perfil (usado para decidir se é admin)
+_profile_cache = TTLCache("profiles", maxsize=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL)
+
+def invalidate_profile(user_id) -> None:
+    """ Descarta o perfil em cache (chamar sempre que 'is_admin' ou o perfil mudar). """
+    _profile_cache.invalidate(str(user_id))
+
+def auth_mode() -> str:
+    """ "local" ou "remote"; sem AUTH_MODE, local só quando há chave para verificar o token. """
+    if settings.AUTH_MODE:
+        return settings.AUTH_MODE
+    return "local" if settings.SUPABASE_JWT_SECRET or settings.SUPABASE_JWKS_URL else "remote"
+
+# Chaves públicas do projeto (só usadas quando não há segredo HS256 configurado)
+_jwks_client = None
+
+def _get_jwks_client() -> jwt.PyJWKClient:
+    global _jwks_client
+    if _jwks_client is None:
+        _jwks_client = jwt.PyJWKClient(
+            settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+            cache_keys=True,
+            lifespan=3600,
+        )
+    return _jwks_client
+
+
+def _decode_local(jwt_token: str) -> dict:
+    """
+    Verifica assinatura, expiração e audiência do JWT sem sair do processo.
+    Usa o segredo do projeto (HS256) ou, na falta dele, o JWKS em cache.
+    """
+    options = {"require": ["exp", "sub"]}
+    if settings.SUPABASE_JWT_SECRET:
+        return jwt.decode(
+            jwt_token,
+            settings.SUPABASE_JWT_SECRET,
+            algorithms=["HS256"],
+            audience=settings.JWT_AUDIENCE,
+            options=options,
+        )
+    signing_key = _get_jwks_client().get_signing_key_from_jwt(jwt_token)
+    return jwt.decode(
+        jwt_token,
+        signing_key.key,
+        algorithms=["RS256", "ES256"],
+        audience=settings.JWT_AUDIENCE,
+        options=options,
+    )
+
+
+def _user_from_claims(claims: dict) -> AuthUser:
+    """ Constrói o utilizador a partir das claims do token (mesmo formato do get_user). """
+    aud = claims.get("aud")
+    if isinstance(aud, list):
+        aud = aud[0] if aud else ""
+    return AuthUser(
+        id=claims["sub"],
+        email=claims.get("email"),
+        phone=claims.get("phone"),
+        role=claims.get("role"),
+        aud=aud or "",
+        app_metadata=claims.get("app_metadata") or {},
+        user_metadata=claims.get("user_metadata") or {},
+        created_at=datetime.fromtimestamp(claims.get("iat", 0), tz=timezone.utc),
+    )
+
+
+async def _verify_remote(jwt_token: str) -> AuthUser:
+    return (await supabase.auth.get_user(jwt_token)).user
+
+
+async def _verify_token(jwt_token: str) -> AuthUser:
+    if auth_mode() == "remote":
+        return await _verify_remote(jwt_token)
+
+    user = _token_cache.get(jwt_token)
+    if user is not None:
+        return user
+
+    if settings.SUPABASE_JWT_SECRET:
+        claims = _decode_local(jwt_token)
+    else:
+        # O PyJWKClient pode ter de ir buscar as chaves por HTTP (bloqueante)
+        try:
+            claims = await run_in_threadpool(_decode_local, jwt_token)
+        except jwt.PyJWKClientError:
+            # Sem chave pública para este token (ex.: projeto HS256 sem o segredo
+            # configurado, ou JWKS inacessível): quem decide é o servidor de Auth
+            return await _verify_remote(jwt_token)
+    user = _user_from_claims(claims)
+    # Nunca manter em cache para além da expiração do próprio token
+    _token_cache.set(jwt_token, user, ttl=claims["exp"] - time.time())
+    return user
+
+
+async def get_current_user(token: str = Depends(api_key_header)) -> AuthUser:
     """ Valida o token e retorna os dados do utilizador (da tabela auth). """
     
     if not token or not token.startswith("Bearer "):
@@ -24,10 +131,10 @@ def get_current_user(token: str = Depends(api_key_header)) -> AuthUser:
     jwt_token = token.split(" ")[1]
 
     try:
-        user_response = supabase.auth.get_user(jwt_token)
-        return user_response.user
+        with metrics.phase("auth"):
+            return await _verify_token(jwt_token)
         
-    except AuthApiError as e:
+    except (AuthApiError, jwt.InvalidTokenError, jwt.PyJWKClientError) as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
@@ -42,20 +149,24 @@ def get_current_user(token: str = Depends(api_key_header)) -> AuthUser:
 
 # --- NOVA DEPENDÊNCIA DE ADMIN (Passo 10) ---
 
-def get_current_admin_user(current_user: AuthUser = Depends(get_current_user)) -> Profile:
+async def get_current_admin_user(current_user: AuthUser = Depends(get_current_user)) -> Profile:
     """
     Dependência que verifica se o utilizador autenticado é um admin.
     Busca o perfil e levanta erro 403 se 'is_admin' == false.
     Retorna o perfil completo do admin.
     """
     try:
-        # Busca o perfil do utilizador
-        profile_res = supabase.table('profiles').select("*").eq('id', str(current_user.id)).single().execute()
-        
-        if not profile_res.data:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Perfil de utilizador não encontrado.")
-        
-        profile_data = profile_res.data
+        # Busca o perfil do utilizador (primeiro na cache, depois no banco)
+        profile_data = _profile_cache.get(str(current_user.id))
+        if profile_data is None:
+            profile_res = await supabase.table('profiles').select("*").eq('id', str(current_user.id)).single().execute()
+            
+            if not profile_res.data:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Perfil de utilizador não encontrado.")
+            
+            profile_data = profile_res.data
+            _profile_cache.set(str(current_user.id), profile_data)
+        profile_data = dict(profile_data)
         
         # VERIFICAÇÃO DE ADMIN
         if not profile_data.get('is_admin'):
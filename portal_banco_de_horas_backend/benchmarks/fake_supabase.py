@@ -0,0 +1,448 @@
+# Ficheiro: benchmarks/fake_supabase.py
+# Substituto local do Supabase (PostgREST) servido por um httpx.MockTransport.
+# Guarda as tabelas (e os ficheiros do Storage) em memória, aplica os
+# filtros/ordenação/limites que a API usa e simula a latência de rede,
+# para medir a API sem tocar no projeto real.
+
+import asyncio
+import json
+import random
+import re
+import uuid
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+
+# (tabela, recurso embebido) -> (coluna local, coluna remota, devolve uma linha?)
+EMBEDS = {
+    ("requests", "profiles"): ("user_id", "id", True),
+    ("participants", "profiles"): ("user_id", "id", True),
+    ("participants", "challenges"): ("challenge_id", "id", True),
+    ("vacation_history", "profiles"): ("user_id", "id", True),
+    ("profiles", "vacation_balances"): ("id", "user_id", False),
+}
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class FakeSupabase:
+    """
+    Estado em memória + handler para o httpx.MockTransport.
+    `latency` é o atraso (segundos) simulado em cada chamada; `jitter` a variação.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, service_key: str = "benchmark-service-key"):
+        self.latency = latency
+        # Como no Supabase, a API de admin do Auth só aceita a service_role key,
+        # tal como as tabelas/RPCs fechadas à chave pública (RLS + revoke nos sql/)
+        self.service_key = service_key
+        self.service_only = {"balance_ledger", "balance_snapshots", "balance_as_of",
+                             "take_balance_snapshots", "reconcile_balances", "deleted_rows"}
+        self.jitter = jitter
+        self.tables: Dict[str, List[dict]] = {}
+        self.rpcs: Dict[str, Callable[[dict], Any]] = {}
+        self.auth_users: Dict[str, dict] = {}
+        self.objects: Dict[str, bytes] = {}  # "bucket/caminho" -> conteúdo (Storage)
+        self._upload_tokens: Dict[str, str] = {}
+        self.calls = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    # --- HTTP ---
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        path = request.url.path
+        if path == "/auth/v1/health":
+            return httpx.Response(200, json={"name": "GoTrue", "description": "simulado"})
+        if path == "/auth/v1/admin/users":
+            return self._admin_users(request)
+        if path.startswith("/storage/v1/"):
+            return self._storage(unquote(path[len("/storage/v1"):]), request)
+        if path.startswith("/rest/v1/") and path.rsplit("/", 1)[1] in self.service_only \
+                and request.headers.get("authorization") != f"Bearer {self.service_key}":
+            return httpx.Response(401, json={"code": "42501", "message": f"permission denied for {path.rsplit('/', 1)[1]}"})
+        if path.startswith("/rest/v1/rpc/"):
+            return self._rpc(path.rsplit("/", 1)[1], request)
+        if path.startswith("/rest/v1/"):
+            return self._table(path.split("/")[3], request)
+        return httpx.Response(404, json={"message": f"Rota não simulada: {path}"})
+
+    def _rpc(self, name: str, request: httpx.Request) -> httpx.Response:
+        fn = self.rpcs.get(name)
+        if fn is None:
+            return httpx.Response(404, json={"message": f"RPC não simulada: {name}"})
+        params = json.loads(request.content or b"{}")
+        try:
+            return httpx.Response(200, json=fn(params))
+        except Exception as e:
+            return httpx.Response(400, json={"message": str(e), "code": "P0001"})
+
+    def _admin_users(self, request: httpx.Request) -> httpx.Response:
+        # Só o necessário para auth.admin.create_user / list_users
+        if request.headers.get("authorization") != f"Bearer {self.service_key}":
+            return httpx.Response(403, json={"code": 403, "error_code": "not_admin", "msg": "User not allowed"})
+        if request.method == "POST":
+            body = json.loads(request.content or b"{}")
+            email = (body.get("email") or "").lower()
+            if email in self.auth_users:
+                return httpx.Response(422, json={"code": 422, "error_code": "email_exists",
+                                                 "msg": "A user with this email address has already been registered"})
+            user = {"id": str(uuid.uuid4()), "aud": "authenticated", "role": "authenticated", "email": email,
+                    "app_metadata": {}, "user_metadata": body.get("user_metadata") or {}, "created_at": _now()}
+            self.auth_users[email] = user
+            return httpx.Response(200, json=user)
+        params = dict(request.url.params)
+        page, per_page = int(params.get("page", 1)), int(params.get("per_page", 50))
+        users = list(self.auth_users.values())[(page - 1) * per_page:page * per_page]
+        return httpx.Response(200, json={"users": users, "aud": "authenticated"})
+
+    def _storage(self, path: str, request: httpx.Request) -> httpx.Response:
+        # Só o necessário para URLs assinados: upload (criar + PUT), assinar leitura e ler,
+        # e o HEAD de exists()
+        # Os URLs assinados (upload e leitura, usados pelo browser) levam o token no URL;
+        # o resto só com a service_role key
+        signed = (request.method == "PUT" and path.startswith("/object/upload/sign/")) or \
+            (request.method == "GET" and path.startswith("/object/sign/"))
+        if not signed and request.headers.get("authorization") != f"Bearer {self.service_key}":
+            return httpx.Response(403, json={"statusCode": "403", "error": "Unauthorized",
+                                             "message": "new row violates row-level security policy"})
+        if request.method == "HEAD" and path.startswith("/object/"):
+            return httpx.Response(200 if path[len("/object/"):] in self.objects else 404)
+        if path.startswith("/object/upload/sign/"):
+            key = path[len("/object/upload/sign/"):]
+            if request.method == "POST":
+                token = uuid.uuid4().hex
+                self._upload_tokens[token] = key
+                return httpx.Response(200, json={"url": f"/object/upload/sign/{key}?token={token}"})
+            if self._upload_tokens.pop(request.url.params.get("token", ""), None) != key:
+                return httpx.Response(400, json={"statusCode": "403", "error": "InvalidSignature", "message": "Token inválido"})
+            self.objects[key] = request.content
+            return httpx.Response(200, json={"Key": key})
+        if path.startswith("/object/sign/"):
+            key = path[len("/object/sign/"):]
+            if request.method == "POST":
+                body = json.loads(request.content or b"{}")
+                # Como o Storage real: um objeto em falta vem com signedURL null e erro
+                return httpx.Response(200, json=[
+                    {"path": p, "signedURL": f"/object/sign/{key}/{p}?token=simulado", "error": None}
+                    if f"{key}/{p}" in self.objects else
+                    {"path": p, "signedURL": None, "error": "Either the object does not exist or you do not have access to it"}
+                    for p in body.get("paths", [])
+                ])
+            if key not in self.objects:
+                return httpx.Response(404, json={"statusCode": "404", "error": "not_found", "message": "Object not found"})
+            return httpx.Response(200, content=self.objects[key])
+        return httpx.Response(404, json={"message": f"Rota de Storage não simulada: {path}"})
+
+    def _table(self, name: str, request: httpx.Request) -> httpx.Response:
+        rows = self.tables.setdefault(name, [])
+        params = list(request.url.params.multi_items())
+        single = "vnd.pgrst.object" in request.headers.get("accept", "")
+
+        if request.method == "POST":
+            body = json.loads(request.content or b"[]")
+            body = body if isinstance(body, list) else [body]
+            prefer = request.headers.get("prefer", "")
+            conflict = dict(params).get("on_conflict")
+            out = []
+            for item in body:
+                row = {"id": str(uuid.uuid4()), "created_at": _now()}
+                row.update(item)
+                existing = self._find_conflict(rows, row, conflict) if "resolution" in prefer else None
+                if existing is not None:
+                    if "ignore-duplicates" in prefer:
+                        continue
+                    existing.update(item)
+                    out.append(existing)
+                else:
+                    rows.append(row)
+                    out.append(row)
+            return httpx.Response(201, json=out)
+
+        predicates = _compile_filters(params)
+        matched = [r for r in rows if all(p(r) for p in predicates)]
+
+        if request.method == "PATCH":
+            patch = json.loads(request.content or b"{}")
+            for r in matched:
+                r.update(patch)
+            return httpx.Response(200, json=matched)
+
+        if request.method == "DELETE":
+            ids = {id(r) for r in matched}
+            self.tables[name] = [r for r in rows if id(r) not in ids]
+            return httpx.Response(200, json=matched)
+
+        query = dict(params)
+        if "order" in query:
+            for part in reversed(query["order"].split(",")):
+                col, _, direction = part.partition(".")
+                present = [r for r in matched if r.get(col) is not None]
+                missing = [r for r in matched if r.get(col) is None]
+                present.sort(key=lambda r: r[col], reverse=direction.startswith("desc"))
+                matched = present + missing
+        offset = int(query.get("offset", 0))
+        if "limit" in query:
+            matched = matched[offset:offset + int(query["limit"])]
+
+        lookups: Dict[Tuple[str, str], Dict[Any, List[dict]]] = {}
+        data = [self._project(name, r, query.get("select", "*"), lookups) for r in matched]
+        if single:
+            if len(data) != 1:
+                return httpx.Response(406, json={"message": "JSON object requested, multiple (or no) rows returned", "code": "PGRST116"})
+            return httpx.Response(200, json=data[0])
+        return httpx.Response(200, json=data)
+
+    @staticmethod
+    def _find_conflict(rows: List[dict], row: dict, conflict: Optional[str]) -> Optional[dict]:
+        cols = conflict.split(",") if conflict else ["id"]
+        for r in rows:
+            if all(r.get(c) == row.get(c) for c in cols):
+                return r
+        return None
+
+    # --- select / embeds ---
+
+    def _project(self, table: str, row: dict, select: str, lookups: dict) -> dict:
+        out: Dict[str, Any] = {}
+        for part in _split_top(select):
+            part = part.strip()
+            m = re.match(r"^(\w+)(?:!\w+)?\((.*)\)$", part)
+            if m:
+                resource, inner = m.group(1), m.group(2)
+                local, remote, one = EMBEDS[(table, resource)]
+                # Índice (coluna remota -> linhas) construído uma vez por pedido, como um join
+                index = lookups.get((resource, remote))
+                if index is None:
+                    index = lookups[(resource, remote)] = {}
+                    for r in self.tables.get(resource, []):
+                        index.setdefault(r.get(remote), []).append(r)
+                related = [self._project(resource, r, inner, lookups) for r in index.get(row.get(local), [])]
+                out[resource] = (related[0] if related else None) if one else related
+            elif part == "*":
+                out.update(row)
+            else:
+                out[part] = row.get(part)
+        return out
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=256)
+def _split_top(text: str) -> Tuple[str, ...]:
+    """ Divide por vírgulas fora de parênteses e aspas. """
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and quoted and i + 1 < len(text):
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+        i += 1
+    if current:
+        parts.append(current)
+    return tuple(parts)
+
+
+def _compile_filters(params: List[Tuple[str, str]]) -> List[Callable[[dict], bool]]:
+    """ Converte os parâmetros de filtro em predicados (analisados uma vez por pedido). """
+    predicates = []
+    for key, value in params:
+        if key in _RESERVED_PARAMS:
+            continue
+        if key in ("or", "and"):
+            predicates.append(_compile_tree(key, value[1:-1]))
+        else:
+            predicates.append(_compile_condition(key, value))
+    return predicates
+
+
+def _compile_tree(kind: str, body: str) -> Callable[[dict], bool]:
+    children = []
+    for part in _split_top(body):
+        m = re.match(r"^(and|or)\((.*)\)$", part)
+        if m:
+            children.append(_compile_tree(m.group(1), m.group(2)))
+        else:
+            col, _, rest = part.partition(".")
+            children.append(_compile_condition(col, rest))
+    if kind == "and":
+        return lambda row: all(c(row) for c in children)
+    return lambda row: any(c(row) for c in children)
+
+
+def _unquote(value: str) -> str:
+    value = unquote(value)
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _coerce(actual: Any, raw: str) -> Any:
+    if isinstance(actual, bool):
+        return raw == "true"
+    if isinstance(actual, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _compile_condition(col: str, expr: str) -> Callable[[dict], bool]:
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    raw = _unquote(raw)
+
+    def check(row: dict) -> bool:
+        actual = row.get(col)
+        if op == "is":
+            result = actual is None if raw == "null" else actual == (raw == "true")
+        elif op == "in":
+            result = str(actual) in [_unquote(v) for v in raw.strip("()").split(",")]
+        elif op == "cs":
+            wanted = [v.strip('"') for v in raw.strip("{}").split(",") if v]
+            result = all(w in [str(a) for a in (actual or [])] for w in wanted)
+        elif actual is None:
+            result = False
+        else:
+            expected = _coerce(actual, raw)
+            if not isinstance(actual, (int, float)):
+                actual, expected = str(actual), raw
+            if op == "eq":
+                result = actual == expected
+            elif op == "neq":
+                result = actual != expected
+            elif op == "gt":
+                result = actual > expected
+            elif op == "gte":
+                result = actual >= expected
+            elif op == "lt":
+                result = actual < expected
+            else:
+                result = actual <= expected
+        return not result if negate else result
+    return check
+
+
+# --- dados de exemplo ---
+
+def seed(fake: FakeSupabase, users: int = 200, requests: int = 5000, participants: int = 10000,
+         challenges: int = 50, vacations: int = 3000, seed_value: int = 42) -> List[dict]:
+    """ Preenche as tabelas com volumes realistas. Devolve os perfis criados. """
+    rnd = random.Random(seed_value)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    roles = ["Analista", "Técnico", "Chefe de Seção", "Estagiário"]
+
+    def ts(i: int) -> str:
+        return (start + timedelta(minutes=37 * i)).isoformat()
+
+    profiles = [{
+        "id": str(uuid.UUID(int=rnd.getrandbits(128))), "name": f"Servidor {i:04d}", "role": rnd.choice(roles),
+        "is_admin": i == 0, "points": rnd.randint(0, 500), "hours": rnd.randint(0, 80),
+        "email": f"servidor{i}@exemplo.pt", "created_at": ts(i),
+    } for i in range(users)]
+    fake.tables["profiles"] = profiles
+    fake.tables["roles"] = [{"id": str(uuid.uuid4()), "name": r, "created_at": ts(0)} for r in roles]
+    fake.tables["settings"] = [{"id": 1, "points_per_hour": 10}]
+    fake.tables["vacation_balances"] = [{"user_id": p["id"], "days": rnd.randint(0, 45)} for p in profiles]
+    fake.tables["challenges"] = [{
+        "id": str(uuid.uuid4()), "title": f"Desafio {i}", "description": "Descrição do desafio " * 5,
+        "points": rnd.randint(5, 100), "allowed_roles": rnd.choice([[], [], [rnd.choice(roles)]]),
+        "allowed_user_ids": [], "due_at": None, "created_at": ts(i),
+    } for i in range(challenges)]
+    fake.tables["requests"] = [{
+        "id": str(uuid.uuid4()), "user_id": rnd.choice(profiles)["id"], "type": rnd.choice(["concessao", "gozo"]),
+        "hours": rnd.randint(1, 16), "reason": "Motivo do pedido", "status": rnd.choice(["pendente", "aprovado", "negado"]),
+        "created_at": ts(i),
+    } for i in range(requests)]
+    fake.tables["participants"] = [{
+        "id": str(uuid.uuid4()), "user_id": rnd.choice(profiles)["id"], "challenge_id": rnd.choice(fake.tables["challenges"])["id"],
+        "status": rnd.choice(["inscrito", "enviado", "validado", "recusado"]), "proof_url": "https://exemplo.pt/prova",
+        "created_at": ts(i),
+    } for i in range(participants)]
+    fake.tables["vacation_history"] = []
+    for i in range(vacations):
+        begin = (start + timedelta(days=rnd.randint(0, 700))).date()
+        fake.tables["vacation_history"].append({
+            "id": str(uuid.uuid4()), "user_id": rnd.choice(profiles)["id"], "start_date": begin.isoformat(),
+            "end_date": (begin + timedelta(days=rnd.randint(1, 20))).isoformat(), "notes": None, "created_at": ts(i),
+        })
+
+    def ajustar_saldo_ferias(params: dict) -> int:
+        # Mesma semântica da função SQL: incremento + histórico, sem intercalação
+        balances = fake.tables["vacation_balances"]
+        row = next((b for b in balances if b["user_id"] == params["p_user_id"]), None)
+        if row is None:
+            row = {"user_id": params["p_user_id"], "days": 0}
+            balances.append(row)
+        row["days"] += params["p_dias"]
+        today = datetime.now(timezone.utc).date().isoformat()
+        fake.tables["vacation_history"].append({
+            "id": str(uuid.uuid4()), "user_id": params["p_user_id"], "start_date": today,
+            "end_date": today, "notes": params["p_nota"], "created_at": _now(),
+        })
+        return row["days"]
+
+    fake.rpcs["ajustar_saldo_ferias"] = ajustar_saldo_ferias
+
+    def _counts(rows: List[dict], points: int) -> dict:
+        counts = {k: 0 for k in ("inscrito", "enviado", "validado", "recusado")}
+        for r in rows:
+            counts[r["status"]] += 1
+        total = len(rows)
+        return dict(counts, total=total, points_awarded=counts["validado"] * points,
+                    completion_rate=round(counts["validado"] / total, 4) if total else None)
+
+    def challenge_report(params: dict) -> List[dict]:
+        # Mesma semântica das funções de sql/challenge_report.sql
+        cid = params.get("p_challenge_id")
+        by_challenge: Dict[str, List[dict]] = {}
+        for p in fake.tables["participants"]:
+            by_challenge.setdefault(p["challenge_id"], []).append(p)
+        challenges = [c for c in fake.tables["challenges"] if cid is None or c["id"] == cid]
+        return [dict(_counts(by_challenge.get(c["id"], []), c["points"]), challenge_id=c["id"], title=c["title"],
+                     points=c["points"], due_at=c["due_at"], created_at=c["created_at"])
+                for c in sorted(challenges, key=lambda c: c["created_at"], reverse=True)]
+
+    def challenge_report_by_role(params: dict) -> List[dict]:
+        challenge = next((c for c in fake.tables["challenges"] if c["id"] == params["p_challenge_id"]), None)
+        if challenge is None:
+            return []
+        roles = {p["id"]: p["role"] for p in fake.tables["profiles"]}
+        by_role: Dict[str, List[dict]] = {}
+        for p in fake.tables["participants"]:
+            if p["challenge_id"] == challenge["id"]:
+                by_role.setdefault(roles.get(p["user_id"]), []).append(p)
+        return [dict(_counts(rows, challenge["points"]), role=role) for role, rows in sorted(by_role.items())]
+
+    fake.rpcs["challenge_report"] = challenge_report
+    fake.rpcs["challenge_report_by_role"] = challenge_report_by_role
+
+    for name in ("process_request", "validate_participation", "admin_add_hours", "convert_points_to_hours",
+                 "admin_reset_password", "admin_delete_user"):
+        fake.rpcs[name] = lambda params: None
+    return profiles
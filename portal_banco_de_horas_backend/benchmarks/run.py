@@ -0,0 +1,161 @@
+# Ficheiro: benchmarks/run.py
+# Benchmark de carga da API contra o Supabase simulado (benchmarks/fake_supabase.py).
+#
+# Uso (a partir da pasta portal_banco_de_horas_backend):
+#   python -m benchmarks.run
+#   python -m benchmarks.run --latency-ms 30 --concurrency 100 --requests 500 --scenario admin
+#
+# Para cada cenário mostra p50/p95/p99 (ms), pedidos por segundo e chamadas ao Supabase por pedido.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# O settings lê estas variáveis antes do .env: nunca falar com o projeto real
+BENCH_SECRET = "benchmark-secret-benchmark-secret-0123"
+os.environ.update({
+    "SUPABASE_URL": "http://supabase.benchmark.local",
+    "SUPABASE_KEY": "benchmark-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "benchmark-service-key",
+    "SUPABASE_JWT_SECRET": BENCH_SECRET,
+    "AUTH_MODE": "local",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+
+from benchmarks.fake_supabase import FakeSupabase, seed  # noqa: E402
+
+# nome -> (grupo, método, caminho, parâmetros, precisa de admin)
+SCENARIOS = {
+    "me": ("user", "GET", "/me/", None, False),
+    "me_requests": ("user", "GET", "/me/requests", None, False),
+    "me_participations": ("user", "GET", "/me/participations", None, False),
+    "me_settings": ("user", "GET", "/me/settings", None, False),
+    "me_dashboard": ("user", "GET", "/me/dashboard", None, False),
+    "leaderboard": ("user", "GET", "/leaderboard", None, False),
+    "admin_requests": ("admin", "GET", "/admin/requests", None, True),
+    "admin_requests_page": ("admin", "GET", "/admin/requests", {"limit": 100}, True),
+    "admin_participants_all": ("admin", "GET", "/admin/participants/all", None, True),
+    "admin_participants_page": ("admin", "GET", "/admin/participants/all", {"limit": 100}, True),
+    "admin_challenges": ("admin", "GET", "/admin/challenges", None, True),
+    "admin_challenges_report": ("admin", "GET", "/admin/challenges/report", None, True),
+    "admin_users": ("admin", "GET", "/admin/users", None, True),
+    "ferias_relatorio": ("admin", "GET", "/ferias/admin/relatorio", None, True),
+    "ferias_ausentes": ("admin", "GET", "/ferias/admin/ausentes", {"data_inicio": "2024-06-01", "data_fim": "2024-06-30"}, True),
+}
+
+
+def mint_token(user_id: str, email: str, ttl: int = 3600) -> str:
+    now = int(time.time())
+    claims = {"sub": user_id, "email": email, "aud": "authenticated", "role": "authenticated", "iat": now, "exp": now + ttl}
+    return jwt.encode(claims, BENCH_SECRET, algorithm="HS256")
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def start_app(fake: FakeSupabase):
+    """ Liga a app ao Supabase simulado e devolve (app, fecho). """
+    import main
+    import supabase_client
+    await supabase_client.connect(transport=fake.transport())
+    return main.app, supabase_client.disconnect
+
+
+async def run_scenario(client: httpx.AsyncClient, fake: FakeSupabase, method: str, path: str, params, tokens, total: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    calls_before = fake.calls
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+            start = time.perf_counter()
+            r = await client.request(method, path, params=params, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if r.status_code >= 400:
+                errors += 1
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - wall
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "rps": total / wall if wall else 0.0,
+        "db_calls_per_request": (fake.calls - calls_before) / total if total else 0.0,
+    }
+
+
+async def main_async(args) -> dict:
+    random.seed(args.seed)
+    fake = FakeSupabase(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    profiles = seed(fake, users=args.users, requests=args.rows_requests, participants=args.rows_participants,
+                    challenges=args.challenges, vacations=args.rows_vacations, seed_value=args.seed)
+    admin = profiles[0]
+    admin_tokens = [mint_token(admin["id"], admin["email"])]
+    user_tokens = [mint_token(p["id"], p["email"]) for p in profiles[1:51]]
+
+    app, close = await start_app(fake)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.benchmark") as client:
+        for name, (group, method, path, params, needs_admin) in SCENARIOS.items():
+            if args.scenario and args.scenario not in (name, group):
+                continue
+            tokens = admin_tokens if needs_admin else user_tokens
+            # aquecimento (caches, JWT, pool de ligações)
+            await run_scenario(client, fake, method, path, params, tokens, min(args.concurrency, 5), args.concurrency)
+            results[name] = await run_scenario(client, fake, method, path, params, tokens, args.requests, args.concurrency)
+            r = results[name]
+            print(f"{name:<26} p50={r['p50_ms']:8.1f}ms p95={r['p95_ms']:8.1f}ms p99={r['p99_ms']:8.1f}ms "
+                  f"{r['rps']:8.1f} req/s  db/req={r['db_calls_per_request']:.2f}  erros={r['errors']}")
+    await close()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da API do Portal Banco de Horas (Supabase simulado).")
+    parser.add_argument("--scenario", help="Cenário ou grupo ('user', 'admin') a correr; por omissão todos.")
+    parser.add_argument("--requests", type=int, default=50, help="Pedidos por cenário.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Pedidos em simultâneo.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latência simulada por chamada ao Supabase.")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Variação da latência simulada.")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--challenges", type=int, default=60)
+    parser.add_argument("--rows-requests", type=int, default=2000)
+    parser.add_argument("--rows-participants", type=int, default=4000)
+    parser.add_argument("--rows-vacations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Grava os resultados neste ficheiro JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(main_async(args))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
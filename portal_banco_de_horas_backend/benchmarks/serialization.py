@@ -0,0 +1,85 @@
+# Ficheiro: benchmarks/serialization.py
+# Micro-benchmark da serialização de listas grandes (AdminParticipantDetails):
+#   antes     -> model_validate linha a linha + response_model do FastAPI (2ª validação + json.dumps)
+#   validado  -> uma validação com TypeAdapter + dump_json direto em bytes (serialization.list_response)
+#   confiável -> TRUST_DB_ROWS: linhas do banco serializadas sem validação
+#
+# Uso (a partir da pasta portal_banco_de_horas_backend):
+#   python -m benchmarks.serialization --rows 10000 --repeat 5
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import benchmarks.run  # noqa: F401  (prepara o ambiente: settings sem o .env real)
+from benchmarks.fake_supabase import FakeSupabase, seed
+
+import httpx
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+
+from models import AdminParticipantDetails
+from serialization import list_response
+from settings import settings
+
+
+def build_rows(n: int) -> list:
+    fake = FakeSupabase()
+    seed(fake, users=300, requests=0, participants=n, challenges=60, vacations=0)
+    select = "*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)"
+    return [fake._project("participants", r, select, {}) for r in fake.tables["participants"]]
+
+
+def build_app(rows: list) -> FastAPI:
+    app = FastAPI()
+    adapter = TypeAdapter(List[AdminParticipantDetails])
+
+    @app.get("/antes", response_model=List[AdminParticipantDetails])
+    async def antes():
+        return [AdminParticipantDetails.model_validate(item) for item in rows]
+
+    @app.get("/depois", response_model=List[AdminParticipantDetails])
+    async def depois():
+        return list_response(adapter, rows)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        r = await client.get(path)
+        r.raise_for_status()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main_async(args):
+    rows = build_rows(args.rows)
+    app = build_app(rows)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/antes")
+        results = {"antes": await measure(client, "/antes", args.repeat)}
+        settings.TRUST_DB_ROWS = False
+        results["validado"] = await measure(client, "/depois", args.repeat)
+        settings.TRUST_DB_ROWS = True
+        results["confiavel"] = await measure(client, "/depois", args.repeat)
+        settings.TRUST_DB_ROWS = False
+
+    base = results["antes"]
+    for name, seconds in results.items():
+        per_10k = seconds * 10000 / args.rows * 1000
+        print(f"{name:<10} {seconds * 1000:9.1f}ms  ({per_10k:8.1f}ms por 10k linhas, {base / seconds:5.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de serialização de listas grandes.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Ficheiro: bulk.py
+# Execução de operações em lote com concorrência limitada e resultado por item.
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, Iterable, List, Optional, TypeVar
+
+from models import BulkItemResult
+from settings import settings
+
+T = TypeVar("T")
+
+
+async def run_bounded(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[BulkItemResult]],
+    concurrency: int = settings.BULK_CONCURRENCY,
+    key: Optional[Callable[[T], Hashable]] = None,
+) -> List[BulkItemResult]:
+    """
+    Corre `worker` para cada item, no máximo `concurrency` de cada vez.
+    Um erro num item não interrompe os restantes; a ordem do resultado
+    é a mesma da entrada. Com `key`, só a primeira ocorrência de cada id
+    corre: duas execuções em paralelo sobre a mesma linha podiam ambas
+    encontrá-la pendente e aplicar a operação duas vezes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    seen = set()
+
+    async def guarded(item: T) -> BulkItemResult:
+        async with semaphore:
+            return await worker(item)
+
+    async def duplicate(item: T) -> BulkItemResult:
+        return BulkItemResult(id=str(key(item)), ok=False, error="Item repetido no lote.")
+
+    def dispatch(item: T) -> Awaitable[BulkItemResult]:
+        if key is not None:
+            k = key(item)
+            if k in seen:
+                return duplicate(item)
+            seen.add(k)
+        return guarded(item)
+
+    return list(await asyncio.gather(*[dispatch(i) for i in items]))
@@ -0,0 +1,120 @@
+# Ficheiro: cache.py
+# Cache em memória (por processo) com TTL e limite de tamanho (LRU).
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from settings import settings
+
+# Registo de todas as caches criadas, para expor estatísticas
+caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Cache chave -> valor com tempo de vida por entrada e despejo LRU
+    quando o número máximo de entradas é atingido.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# --- Cache de respostas JSON (já serializadas) ---
+
+# Chave -> (bytes JSON, ETag, valor validado). Invalidada pelas rotas de escrita do admin.
+response_cache = TTLCache("responses", maxsize=64, ttl=settings.RESPONSE_CACHE_TTL)
+
+
+async def cached_entry(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+    ttl: Optional[float] = None,
+) -> tuple:
+    """ Devolve (bytes, etag, valor) da cache, carregando com `loader` se preciso. """
+    entry = response_cache.get(key)
+    if entry is None:
+        value = adapter.validate_python(await loader())
+        body = adapter.dump_json(value)
+        entry = (body, '"%s"' % hashlib.sha1(body).hexdigest(), value)
+        response_cache.set(key, entry, ttl)
+    return entry
+
+
+async def cached_value(key: str, loader: Callable[[], Awaitable[Any]], adapter: TypeAdapter) -> Any:
+    """ Igual a cached_entry, mas só devolve os objetos validados (para compor respostas). """
+    return (await cached_entry(key, loader, adapter))[2]
+
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+    ttl: Optional[float] = None,
+) -> Response:
+    """
+    Devolve a resposta guardada em cache (bytes prontos, sem voltar a validar
+    com Pydantic) ou carrega-a com `loader`. Responde 304 se o cliente já
+    tiver a mesma versão (If-None-Match).
+    """
+    body, etag, _ = await cached_entry(key, loader, adapter, ttl)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
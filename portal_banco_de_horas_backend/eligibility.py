@@ -0,0 +1,63 @@
+# Ficheiro: eligibility.py
+# Índice em memória de "quem pode ver que desafio" (cargo -> desafios, utilizador -> desafios).
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from models import Challenge
+
+
+class EligibilityIndex:
+    """
+    Construído a partir da lista de desafios ativos (ordenada por created_at desc).
+    Desafio sem allowed_roles nem allowed_user_ids é aberto a todos; caso contrário
+    é visível para quem tiver um dos cargos ou estiver na lista de utilizadores.
+    """
+
+    def __init__(self, challenges: List[Challenge]):
+        self.source = challenges
+        self._position: Dict[UUID, int] = {}
+        self._open: List[int] = []
+        self._by_role: Dict[str, List[int]] = defaultdict(list)
+        self._by_user: Dict[UUID, List[int]] = defaultdict(list)
+        for pos, c in enumerate(challenges):
+            self._position[c.id] = pos
+            roles = c.allowed_roles or []
+            ids = c.allowed_user_ids or []
+            if not roles and not ids:
+                self._open.append(pos)
+            for role in roles:
+                self._by_role[role].append(pos)
+            for uid in ids:
+                self._by_user[uid].append(pos)
+
+    def for_user(self, role: str, user_id: UUID, now: Optional[datetime] = None) -> List[Challenge]:
+        """ Desafios visíveis para o utilizador e ainda dentro do prazo, na ordem original. """
+        now = now or datetime.now(timezone.utc)
+        positions = set(self._open)
+        positions.update(self._by_role.get(role, ()))
+        positions.update(self._by_user.get(user_id, ()))
+        result = []
+        for pos in sorted(positions):
+            c = self.source[pos]
+            # A lista pode estar em cache há uns minutos: voltar a confirmar o prazo
+            if c.due_at is None or _aware(c.due_at) > now:
+                result.append(c)
+        return result
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+_index: Optional[EligibilityIndex] = None
+
+
+def index_for(challenges: List[Challenge]) -> EligibilityIndex:
+    """ Reaproveita o índice enquanto a lista em cache for a mesma; reconstrói quando muda. """
+    global _index
+    if _index is None or _index.source is not challenges:
+        _index = EligibilityIndex(challenges)
+    return _index
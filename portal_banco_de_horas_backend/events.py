@@ -0,0 +1,181 @@
+# Ficheiro: events.py
+# Notificações em tempo real para os ecrãs do admin (Server-Sent Events).
+# Em vez de cada admin recarregar /admin/participants/pending e /admin/requests,
+# o processo subscreve UMA vez as alterações (Supabase Realtime ou, na falta dele,
+# as escritas feitas pela própria API) e reenvia-as a todos os admins ligados.
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from typing import Optional, Set
+
+import jwt
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+import auth
+from cache import TTLCache
+from models import EventsTicket, Profile
+from settings import settings
+from supabase_client import supabase
+
+logger = logging.getLogger("portal.events")
+
+# Tabelas cujas alterações interessam às filas do admin
+TABLES = ("participants", "requests")
+
+
+class Broker:
+    """
+    Distribui cada evento por todos os subscritores ligados. Cada subscritor tem
+    uma fila limitada: um cliente lento perde eventos (e recarrega a lista),
+    nunca atrasa os outros nem faz crescer a memória do processo.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._seq = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, table: str, event_type: str, record: Optional[dict]) -> None:
+        if not self._subscribers:
+            return
+        self._seq += 1
+        message = (self._seq, table, json.dumps({"type": event_type, "record": record}, default=str))
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+
+broker = Broker(settings.EVENTS_QUEUE_SIZE)
+
+# Canal do Supabase Realtime (None = eventos publicados pelas rotas da API)
+_channel = None
+
+
+def publish(table: str, event_type: str, record: Optional[dict]) -> None:
+    """
+    Chamado pelas rotas depois de escreverem em `participants`/`requests`.
+    Com o Realtime ligado o evento chega pelo canal; publicar aqui duplicava-o.
+    """
+    if _channel is None:
+        broker.publish(table, event_type, record)
+
+
+def _on_change(payload: dict) -> None:
+    data = payload.get("data", {})
+    broker.publish(data.get("table"), data.get("type"), data.get("record") or data.get("old_record"))
+
+
+async def start_realtime() -> None:
+    """ Subscreve as alterações das tabelas no Supabase Realtime (uma ligação por processo). """
+    global _channel
+    if not settings.REALTIME_ENABLED:
+        return
+    try:
+        client = supabase.realtime
+        await client.connect()
+        channel = client.channel("admin-queues")
+        for table in TABLES:
+            channel.on_postgres_changes("*", _on_change, table=table, schema="public")
+        await channel.subscribe()
+        _channel = channel
+    except Exception as e:
+        logger.warning("Realtime indisponível, a usar só os eventos locais: %s", e)
+
+
+async def stop_realtime() -> None:
+    global _channel
+    if _channel is not None:
+        client = supabase.realtime
+        await client.remove_all_channels()
+        await client.close()
+        _channel = None
+
+
+# O EventSource do browser não envia cabeçalhos, por isso a autenticação vai na URL.
+# Em vez do JWT da sessão (que ficaria nos logs de acesso) vai um bilhete próprio:
+# só abre este stream, expira em EVENTS_TICKET_TTL segundos e só serve uma vez.
+_TICKET_AUDIENCE = "portal-admin-events"
+_used_tickets = TTLCache("events_tickets", maxsize=1024, ttl=settings.EVENTS_TICKET_TTL)
+
+# Segredo só do servidor (nunca a SUPABASE_KEY, que é pública). Sem nenhum configurado,
+# um segredo aleatório por processo: os bilhetes só valem no processo que os emitiu.
+_ticket_secret = settings.EVENTS_TICKET_SECRET or settings.SUPABASE_JWT_SECRET or secrets.token_urlsafe(32)
+
+
+def _issue_ticket(admin: Profile) -> str:
+    now = int(time.time())
+    claims = {"sub": str(admin.id), "email": admin.email, "aud": _TICKET_AUDIENCE,
+              "iat": now, "exp": now + settings.EVENTS_TICKET_TTL, "jti": secrets.token_urlsafe(16)}
+    # Com um segredo configurado, vale em qualquer processo da API
+    return jwt.encode(claims, _ticket_secret, algorithm="HS256")
+
+
+async def _admin_from_ticket(ticket: str = Query(..., description="Bilhete de POST /admin/events/ticket.")) -> Profile:
+    try:
+        claims = jwt.decode(ticket, _ticket_secret, algorithms=["HS256"], audience=_TICKET_AUDIENCE,
+                            options={"require": ["exp", "sub", "jti"]})
+    except jwt.InvalidTokenError:
+        claims = None
+    if claims is None or _used_tickets.get(claims["jti"]) is not None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bilhete inválido ou expirado.")
+    _used_tickets.set(claims["jti"], True)
+    # Volta a confirmar que continua admin
+    return await auth.get_current_admin_user(auth._user_from_claims(claims))
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post("/events/ticket", response_model=EventsTicket)
+async def admin_events_ticket(admin: Profile = Depends(auth.get_current_admin_user)):
+    """ Bilhete de uso único e curta duração para abrir GET /admin/events?ticket=... """
+    return EventsTicket(ticket=_issue_ticket(admin), expires_in=settings.EVENTS_TICKET_TTL)
+
+
+@router.get("/events")
+async def admin_events(request: Request, admin: Profile = Depends(_admin_from_ticket)):
+    """
+    Stream SSE com os INSERT/UPDATE/DELETE de `participants` e `requests`
+    (evento = nome da tabela, dados = {"type", "record"}).
+    """
+    if broker.subscribers >= settings.EVENTS_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Demasiadas ligações de eventos.")
+    queue = broker.subscribe()
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    seq, table, data = await asyncio.wait_for(queue.get(), settings.EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Comentário SSE: mantém a ligação aberta nos proxies
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {seq}\nevent: {table}\ndata: {data}\n\n"
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
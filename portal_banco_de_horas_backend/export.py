@@ -0,0 +1,65 @@
+# Ficheiro: export.py
+# Exportação em streaming (CSV ou NDJSON): as linhas são escritas à medida que
+# as páginas chegam do banco, sem montar o relatório inteiro em memória.
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def _csv_lines(pages: AsyncIterator[List[dict]], fieldnames: Sequence[str]):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    async for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def _ndjson_lines(pages: AsyncIterator[List[dict]]):
+    async for rows in pages:
+        yield "".join(json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in rows)
+
+
+def streaming_export(
+    pages: AsyncIterator[List[dict]],
+    fmt: str,
+    fieldnames: Sequence[str],
+    filename: str,
+    transform: Optional[Callable[[dict], dict]] = None,
+) -> StreamingResponse:
+    """
+    Cria a resposta de exportação. `transform` achata cada linha (ex.: joins)
+    antes de ser escrita.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use 'csv' ou 'ndjson'.")
+
+    if transform is not None:
+        source = pages
+
+        async def transformed():
+            async for rows in source:
+                yield [transform(r) for r in rows]
+
+        pages = transformed()
+
+    body = _csv_lines(pages, fieldnames) if fmt == "csv" else _ndjson_lines(pages)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
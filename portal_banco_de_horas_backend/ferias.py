@@ -1,9 +1,17 @@
 # ferias.py
-from fastapi import APIRouter
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from postgrest.exceptions import APIError
 from pydantic import BaseModel
 from supabase_client import supabase # O nosso arquivo de conexão com o banco
-from datetime import date
-from typing import Optional
+import auth
+from datetime import date, timedelta
+from typing import Dict, Optional
+from pagination import paginate, page_rows, iter_pages, MAX_PAGE_SIZE
+from export import streaming_export
+from intervalos import IntervalIndex
+from settings import settings
 
 # Criamos um "roteador" para agrupar todas as rotas relacionadas a férias
 router = APIRouter(prefix="/ferias", tags=["Férias"])
@@ -29,12 +37,12 @@ class NovaFerias(BaseModel):
 # ==========================================
 
 @router.get("/meu-saldo/{user_id}")
-def obter_saldo_usuario(user_id: str):
+async def obter_saldo_usuario(user_id: str):
     """
     Devolve apenas o saldo atual do servidor. 
     Não faz alterações no banco de dados.
     """
-    resposta = supabase.table("vacation_balances").select("days").eq("user_id", user_id).execute()
+    resposta = await supabase.table("vacation_balances").select("days").eq("user_id", user_id).execute()
     
     # Se o utilizador já tiver um registo, devolvemos os dias. Se não, devolvemos 0.
     if len(resposta.data) > 0:
@@ -47,68 +55,238 @@ def obter_saldo_usuario(user_id: str):
 # ==========================================
 
 @router.post("/admin/ajustar-saldo")
-def ajustar_saldo_admin(dados: AjusteSaldo):
+async def ajustar_saldo_admin(dados: AjusteSaldo):
     """
     O Admin adiciona ou remove dias do saldo do funcionário.
+    O incremento e o registo no histórico são feitos pela função
+    'ajustar_saldo_ferias' (ver sql/ajustar_saldo_ferias.sql) numa só chamada,
+    por isso ajustes em simultâneo não se sobrepõem.
     """
-    # Passo A: Descobrir quantos dias o funcionário já tem hoje
-    resposta = supabase.table("vacation_balances").select("days").eq("user_id", dados.user_id).execute()
+    nota = f"AJUSTE MANUAL DE SALDO: {dados.dias} dias"
     
-    saldo_atual = 0
-    if len(resposta.data) > 0:
-        saldo_atual = resposta.data[0]["days"]
-        
-    # Passo B: Calcular o novo saldo
-    novo_saldo = saldo_atual + dados.dias
-    
-    # Passo C: Guardar o novo saldo no banco (upsert = atualiza se existir, cria se não existir)
-    supabase.table("vacation_balances").upsert({
-        "user_id": dados.user_id,
-        "days": novo_saldo
-    }).execute()
-    
-    # Passo D: Criar um registro no histórico
-    hoje = date.today().isoformat()
-    nota = f"AJUSTE MANUAL DE SALDO: {dados.dias} dias" if dados.dias >= 0 else f"AJUSTE MANUAL DE SALDO: {dados.dias} dias"
-    
-    supabase.table("vacation_history").insert({
-        "user_id": dados.user_id,
-        "start_date": hoje,
-        "end_date": hoje,
-        "notes": nota
+    resposta = await supabase.rpc("ajustar_saldo_ferias", {
+        "p_user_id": dados.user_id,
+        "p_dias": dados.dias,
+        "p_nota": nota
     }).execute()
+    novo_saldo = resposta.data
     
     return {"mensagem": "Saldo atualizado com sucesso!", "novo_saldo": novo_saldo}
 
 @router.post("/admin/historico")
-def registrar_periodo_ferias(dados: NovaFerias):
+async def registrar_periodo_ferias(dados: NovaFerias):
     """
     O Admin regista no histórico que o funcionário vai tirar férias.
+    Recusa (409) um período que se sobreponha a outras férias do mesmo funcionário.
     """
-    supabase.table("vacation_history").insert({
-        "user_id": dados.user_id,
-        "start_date": dados.start_date.isoformat(),
-        "end_date": dados.end_date.isoformat(),
-        "notes": dados.notes
-    }).execute()
+    if dados.end_date < dados.start_date:
+        raise HTTPException(status_code=400, detail="A data de fim é anterior à data de início.")
+
+    indice = await obter_indice()
+    for inicio, fim, linha in indice.overlapping(dados.start_date, dados.end_date):
+        if linha["user_id"] == dados.user_id:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Sobrepõe-se às férias de {inicio.isoformat()} a {fim.isoformat()}.",
+            )
+
+    try:
+        resposta = await supabase.table("vacation_history").insert({
+            "user_id": dados.user_id,
+            "start_date": dados.start_date.isoformat(),
+            "end_date": dados.end_date.isoformat(),
+            "notes": dados.notes
+        }).execute()
+    except APIError as e:
+        # Restrição de exclusão (sql/vacation_history_ranges.sql): registo simultâneo noutro processo
+        if e.code == "23P01":
+            raise HTTPException(status_code=409, detail="Sobrepõe-se a outro período de férias deste funcionário.")
+        raise
+    if resposta.data:
+        _indexar(resposta.data[0])
     
     return {"mensagem": "Período de férias registado com sucesso!"}
 
 @router.get("/admin/relatorio")
-def obter_relatorio_ferias():
+async def obter_relatorio_ferias(
+    response: Response,
+    user_id: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """
     Gera o relatório com todos os períodos de férias agendados ou tirados.
     Puxa também o nome do perfil do utilizador.
+    Devolve uma página ('limit' linhas, por omissão DEFAULT_PAGE_SIZE) e o cursor da
+    seguinte no cabeçalho X-Next-Cursor.
     """
     # A magia do Supabase: com "profiles(name)", ele já traz o nome do funcionário junto!
-    resposta = supabase.table("vacation_history").select("*, profiles(name)").order("start_date", desc=True).execute()
-    return resposta.data
+    query = supabase.table("vacation_history").select("*, profiles(name)")
+    if user_id: query = query.eq("user_id", user_id)
+    if data_inicio: query = query.gte("start_date", data_inicio.isoformat())
+    if data_fim: query = query.lte("start_date", data_fim.isoformat())
+    resposta = await paginate(query, ("start_date", "id"), True, cursor, limit).execute()
+    return page_rows(resposta.data, ("start_date", "id"), limit, response)
+
+def _linha_relatorio(linha: dict) -> dict:
+    perfil = linha.pop("profiles", None) or {}
+    linha["name"] = perfil.get("name")
+    return linha
+
+@router.get("/admin/relatorio/export", dependencies=[Depends(auth.get_current_admin_user)])
+async def exportar_relatorio_ferias(
+    formato: str = "csv",
+    user_id: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+):
+    """
+    Exporta o relatório de férias em CSV ou NDJSON, lendo o histórico em lotes
+    e escrevendo as linhas à medida que chegam (memória constante).
+    """
+    def query_base():
+        query = supabase.table("vacation_history").select("*, profiles(name)")
+        if user_id: query = query.eq("user_id", user_id)
+        if data_inicio: query = query.gte("start_date", data_inicio.isoformat())
+        if data_fim: query = query.lte("start_date", data_fim.isoformat())
+        return query
+
+    return streaming_export(
+        iter_pages(query_base, ("start_date", "id"), True),
+        formato,
+        ["id", "user_id", "name", "start_date", "end_date", "notes"],
+        "relatorio_ferias",
+        transform=_linha_relatorio,
+    )
 
 @router.delete("/admin/historico/{id}")
-def excluir_registro_ferias(id: str):
+async def excluir_registro_ferias(id: str):
     """
     Exclui um registro do histórico de férias pelo ID.
     O saldo de dias NÃO é alterado automaticamente, se necessário, o admin deve corrigir manualmente.
     """
-    supabase.table("vacation_history").delete().eq("id", id).execute()
-    return {"mensagem": "Registro excluído com sucesso!"}
\ No newline at end of file
+    await supabase.table("vacation_history").delete().eq("id", id).execute()
+    if _indice is not None:
+        _indice.remove(lambda linha: str(linha["id"]) == id)
+    return {"mensagem": "Registro excluído com sucesso!"}
+# ==========================================
+# 4. AUSÊNCIAS E COBERTURA (índice de intervalos)
+# ==========================================
+# O histórico é lido uma vez para um índice de intervalos em memória (intervalos.py),
+# atualizado a cada registo/exclusão feito por esta API e relido a cada
+# VACATION_INDEX_REFRESH segundos. As linhas "AJUSTE MANUAL" (criadas pelo ajuste
+# de saldo) não são ausências e ficam de fora.
+
+_indice: Optional[IntervalIndex] = None
+_indice_lido_em: Optional[float] = None
+_perfis: Dict[str, dict] = {}
+_lock = asyncio.Lock()
+
+def _e_ajuste(linha: dict) -> bool:
+    return (linha.get("notes") or "").startswith("AJUSTE MANUAL")
+
+def _indexar(linha: dict) -> None:
+    if _indice is not None and not _e_ajuste(linha):
+        _indice.add(date.fromisoformat(linha["start_date"]), date.fromisoformat(linha["end_date"]), linha)
+
+async def _ler_tudo(tabela: str, colunas: str) -> list:
+    linhas = []
+    async for pagina in iter_pages(lambda: supabase.table(tabela).select(colunas), ("id",), False):
+        linhas.extend(pagina)
+    return linhas
+
+async def obter_indice() -> IntervalIndex:
+    global _indice, _indice_lido_em, _perfis
+    if _indice is not None and time.monotonic() - _indice_lido_em < settings.VACATION_INDEX_REFRESH:
+        return _indice
+    async with _lock:
+        if _indice is None or time.monotonic() - _indice_lido_em >= settings.VACATION_INDEX_REFRESH:
+            historico, perfis = await asyncio.gather(
+                _ler_tudo("vacation_history", "id, user_id, start_date, end_date, notes"),
+                _ler_tudo("profiles", "id, name, role"),
+            )
+            _indice = IntervalIndex(
+                (date.fromisoformat(l["start_date"]), date.fromisoformat(l["end_date"]), l)
+                for l in historico if not _e_ajuste(l)
+            )
+            _perfis = {p["id"]: p for p in perfis}
+            _indice_lido_em = time.monotonic()
+    return _indice
+
+@router.get("/admin/ausentes", dependencies=[Depends(auth.get_current_admin_user)])
+async def quem_esta_ausente(
+    data_inicio: date,
+    data_fim: Optional[date] = None,
+    role: Optional[str] = None,
+):
+    """
+    Quem está de férias num dia (só data_inicio) ou em algum dia do intervalo.
+    """
+    data_fim = data_fim or data_inicio
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="A data de fim é anterior à data de início.")
+    indice = await obter_indice()
+    ausentes = []
+    for inicio, fim, linha in indice.overlapping(data_inicio, data_fim):
+        perfil = _perfis.get(linha["user_id"], {})
+        if role and perfil.get("role") != role:
+            continue
+        ausentes.append({
+            "id": linha["id"], "user_id": linha["user_id"], "name": perfil.get("name"), "role": perfil.get("role"),
+            "start_date": inicio, "end_date": fim, "notes": linha.get("notes"),
+        })
+    return ausentes
+
+@router.get("/admin/cobertura", dependencies=[Depends(auth.get_current_admin_user)])
+async def calendario_cobertura(
+    data_inicio: date,
+    data_fim: date,
+    role: Optional[str] = None,
+):
+    """
+    Calendário de cobertura por cargo: para cada dia, quantos estão ausentes
+    e quantos ficam disponíveis. No máximo 366 dias por pedido.
+    """
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="A data de fim é anterior à data de início.")
+    dias = (data_fim - data_inicio).days + 1
+    if dias > 366:
+        raise HTTPException(status_code=400, detail="Intervalo máximo de 366 dias.")
+    indice = await obter_indice()
+
+    efetivo: Dict[str, int] = {}
+    for perfil in _perfis.values():
+        if not role or perfil.get("role") == role:
+            efetivo[perfil.get("role")] = efetivo.get(perfil.get("role"), 0) + 1
+
+    # Dias de ausência de cada pessoa dentro do intervalo (conjunto: períodos antigos
+    # sobrepostos não contam a mesma pessoa duas vezes)
+    por_pessoa: Dict[str, set] = {}
+    for inicio, fim, linha in indice.overlapping(data_inicio, data_fim):
+        if linha["user_id"] not in _perfis or _perfis[linha["user_id"]].get("role") not in efetivo:
+            continue
+        primeiro = max(inicio, data_inicio)
+        ultimo = min(fim, data_fim)
+        por_pessoa.setdefault(linha["user_id"], set()).update(
+            range((primeiro - data_inicio).days, (ultimo - data_inicio).days + 1)
+        )
+
+    ausentes = {cargo: [0] * dias for cargo in efetivo}
+    for user_id, offsets in por_pessoa.items():
+        contagem = ausentes[_perfis[user_id].get("role")]
+        for d in offsets:
+            contagem[d] += 1
+
+    return [
+        {
+            "role": cargo,
+            "efetivo": efetivo[cargo],
+            "dias": [
+                {"data": data_inicio + timedelta(days=d), "ausentes": contagem[d], "disponiveis": efetivo[cargo] - contagem[d]}
+                for d in range(dias)
+            ],
+        }
+        for cargo, contagem in sorted(ausentes.items(), key=lambda c: c[0] or "")
+    ]
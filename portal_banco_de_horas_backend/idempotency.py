@@ -0,0 +1,83 @@
+# Ficheiro: idempotency.py
+# Cabeçalho Idempotency-Key para as rotas que criam dados (POST /me/requests, /me/convert).
+#
+# O cliente envia a mesma chave quando repete o pedido (duplo clique, timeout, rede).
+# A primeira execução fica guardada; as repetições devolvem o mesmo resultado sem
+# voltar ao banco e, se chegarem enquanto a primeira ainda corre, esperam por ela.
+# A loja é limitada (TTL + LRU) e vive em cada processo.
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Header, HTTPException, status
+
+from cache import TTLCache
+from settings import settings
+
+# (utilizador, rota, chave) -> (impressão digital do corpo, resultado)
+_store = TTLCache("idempotency", maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL)
+
+# Pedidos com chave que ainda estão a correr
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+async def idempotency_key(
+    key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+) -> Optional[str]:
+    return key
+
+
+def _check_fingerprint(stored: str, fingerprint: str) -> None:
+    if stored != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key já usada com um pedido diferente.",
+        )
+
+
+async def run_once(scope: tuple, key: Optional[str], fingerprint: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Executa `fn` uma só vez por chave. Só os sucessos ficam guardados: um erro
+    pode ser repetido com a mesma chave. `fn` deve conter apenas a escrita (e
+    terminar logo que ela é feita); leituras e respostas montam-se fora dela, para
+    que uma falha depois da escrita não a deixe por guardar.
+    """
+    if not key:
+        return await fn()
+    store_key = scope + (key,)
+
+    hit = _store.get(store_key)
+    if hit is not None:
+        _check_fingerprint(hit[0], fingerprint)
+        return hit[1]
+
+    pending = _inflight.get(store_key)
+    if pending is not None:
+        try:
+            stored_fingerprint, result = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # O primeiro pedido foi interrompido (cliente desligou): tenta de novo
+            return await run_once(scope, key, fingerprint, fn)
+        _check_fingerprint(stored_fingerprint, fingerprint)
+        return result
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[store_key] = future
+    try:
+        result = await fn()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Ninguém à espera: evita o aviso "exception was never retrieved"
+        future.exception()
+        raise
+    else:
+        _store.set(store_key, (fingerprint, result))
+        future.set_result((fingerprint, result))
+        return result
+    finally:
+        _inflight.pop(store_key, None)
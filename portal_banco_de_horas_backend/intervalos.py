@@ -0,0 +1,103 @@
+# Ficheiro: intervalos.py
+# Índice de intervalos fechados [início, fim] para as perguntas "quem está de férias
+# entre A e B" e "este período sobrepõe-se a outro", sem percorrer o histórico todo.
+#
+# Os intervalos ficam ordenados pelo início, partidos em blocos de ~_BLOCK; cada bloco
+# guarda o maior fim que contém. Uma consulta [a, b] pára no primeiro bloco que começa
+# depois de b e salta os blocos cujo maior fim é < a. Inserir e retirar mexem só no
+# bloco afetado (insort + maior fim desse bloco), sem reordenar nem refazer o índice.
+
+from bisect import bisect_right, insort
+from typing import Any, Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Tamanho alvo dos blocos; um bloco com o dobro divide-se em dois
+_BLOCK = 128
+
+
+def _key(item: tuple) -> tuple:
+    # (início, sequência): a sequência desempata sem comparar valores
+    return item[0], item[2]
+
+
+def _max_end(block: List[tuple]):
+    return max(i[1] for i in block)
+
+
+class IntervalIndex(Generic[T]):
+
+    def __init__(self, items: Iterable[Tuple[Any, Any, T]] = ()):
+        # Cada entrada: (início, fim, sequência, valor)
+        self._seq = 0
+        entries = sorted(((start, end, self._next(), value) for start, end, value in items), key=_key)
+        self._blocks: List[List[tuple]] = [entries[i:i + _BLOCK] for i in range(0, len(entries), _BLOCK)]
+        self._firsts = [_key(b[0]) for b in self._blocks]
+        self._max_ends = [_max_end(b) for b in self._blocks]
+        self._len = len(entries)
+
+    def _next(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, start, end, value: T) -> None:
+        """ Insere no bloco certo (insort) e atualiza só o maior fim desse bloco. """
+        item = (start, end, self._next(), value)
+        self._len += 1
+        if not self._blocks:
+            self._blocks.append([item])
+            self._firsts.append(_key(item))
+            self._max_ends.append(end)
+            return
+        b = max(bisect_right(self._firsts, _key(item)) - 1, 0)
+        block = self._blocks[b]
+        insort(block, item, key=_key)
+        self._firsts[b] = _key(block[0])
+        if end > self._max_ends[b]:
+            self._max_ends[b] = end
+        if len(block) >= 2 * _BLOCK:
+            tail = block[_BLOCK:]
+            del block[_BLOCK:]
+            self._max_ends[b] = _max_end(block)
+            self._blocks.insert(b + 1, tail)
+            self._firsts.insert(b + 1, _key(tail[0]))
+            self._max_ends.insert(b + 1, _max_end(tail))
+
+    def remove(self, predicate) -> int:
+        """ Retira os intervalos cujo valor satisfaz `predicate`; devolve quantos saíram. """
+        removed = 0
+        b = 0
+        while b < len(self._blocks):
+            block = self._blocks[b]
+            kept = [i for i in block if not predicate(i[3])]
+            if len(kept) == len(block):
+                b += 1
+                continue
+            removed += len(block) - len(kept)
+            if kept:
+                self._blocks[b] = kept
+                self._firsts[b] = _key(kept[0])
+                self._max_ends[b] = _max_end(kept)
+                b += 1
+            else:
+                del self._blocks[b], self._firsts[b], self._max_ends[b]
+        self._len -= removed
+        return removed
+
+    def overlapping(self, start, end) -> List[Tuple[Any, Any, T]]:
+        """ Todos os intervalos com início <= end e fim >= start, por ordem de início. """
+        found: List[Tuple[Any, Any, T]] = []
+        for block, first, max_end in zip(self._blocks, self._firsts, self._max_ends):
+            if first[0] > end:
+                break
+            if max_end < start:
+                continue
+            for item in block:
+                if item[0] > end:
+                    break
+                if item[1] >= start:
+                    found.append((item[0], item[1], item[3]))
+        return found
@@ -0,0 +1,167 @@
+# Ficheiro: leaderboard.py
+# Ranking de pontos (geral e por cargo) mantido em memória, já ordenado.
+#
+# A lista é lida uma vez do banco e depois atualizada utilizador a utilizador
+# quando os pontos mudam (validação, conversão, ajuste). As posições ("o meu
+# lugar") saem de uma pesquisa binária, sem voltar a ordenar nada. Uma releitura
+# completa a cada LEADERBOARD_REFRESH segundos corrige o que mudar por fora da
+# API (ou noutro processo).
+
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Query
+from supabase_auth.types import User as AuthUser
+
+import auth
+from models import LeaderboardEntry, LeaderboardResponse
+from pagination import iter_pages
+from settings import settings
+from supabase_client import supabase
+
+# (-pontos, nome, id): a ordem natural dos tuplos já é a do ranking
+Key = Tuple[int, str, str]
+
+
+class Ranking:
+    """ Listas ordenadas (geral e por cargo) + índice id -> (chave, cargo). """
+
+    def __init__(self):
+        self._all: List[Key] = []
+        self._by_role: Dict[str, List[Key]] = {}
+        self._users: Dict[str, Tuple[Key, Optional[str]]] = {}
+
+    def load(self, rows: Iterable[dict]) -> None:
+        self._all, self._by_role, self._users = [], {}, {}
+        for row in rows:
+            key = (-(row.get('points') or 0), row.get('name') or "", str(row['id']))
+            self._users[key[2]] = (key, row.get('role'))
+            self._all.append(key)
+            self._by_role.setdefault(row.get('role'), []).append(key)
+        self._all.sort()
+        for keys in self._by_role.values():
+            keys.sort()
+
+    def remove(self, user_id: str) -> None:
+        old = self._users.pop(user_id, None)
+        if old is None:
+            return
+        key, role = old
+        for keys in (self._all, self._by_role.get(role)):
+            if keys is None:
+                continue
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def update(self, row: dict) -> None:
+        """ Reposiciona um utilizador (pontos, nome ou cargo novos). """
+        user_id = str(row['id'])
+        self.remove(user_id)
+        key = (-(row.get('points') or 0), row.get('name') or "", user_id)
+        self._users[user_id] = (key, row.get('role'))
+        insort(self._all, key)
+        insort(self._by_role.setdefault(row.get('role'), []), key)
+
+    def _keys(self, role: Optional[str]) -> List[Key]:
+        return self._all if role is None else self._by_role.get(role, [])
+
+    def rank(self, user_id: str, role: Optional[str] = None) -> Optional[LeaderboardEntry]:
+        """ Posição com empates partilhados (1, 2, 2, 4...): quantos têm mais pontos + 1. """
+        entry = self._users.get(str(user_id))
+        if entry is None or (role is not None and entry[1] != role):
+            return None
+        key, user_role = entry
+        position = bisect_left(self._keys(role), (key[0],)) + 1
+        return LeaderboardEntry(rank=position, id=key[2], name=key[1], role=user_role, points=-key[0])
+
+    def top(self, role: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[LeaderboardEntry]:
+        keys = self._keys(role)
+        page = keys[offset:offset + limit]
+        entries = []
+        for key in page:
+            position = bisect_left(keys, (key[0],)) + 1
+            entries.append(LeaderboardEntry(rank=position, id=key[2], name=key[1], role=self._users[key[2]][1], points=-key[0]))
+        return entries
+
+    def size(self, role: Optional[str] = None) -> int:
+        return len(self._keys(role))
+
+
+ranking = Ranking()
+_loaded_at: Optional[float] = None
+_lock = asyncio.Lock()
+
+_PROFILE_COLUMNS = 'id, name, role, points'
+
+
+async def ensure_loaded() -> Ranking:
+    """ Lê todos os perfis (só as colunas do ranking) na primeira vez e quando a cópia fica velha. """
+    global _loaded_at
+    if _loaded_at is not None and time.monotonic() - _loaded_at < settings.LEADERBOARD_REFRESH:
+        return ranking
+    async with _lock:
+        if _loaded_at is None or time.monotonic() - _loaded_at >= settings.LEADERBOARD_REFRESH:
+            # Em páginas: uma só query ficava cortada no limite de linhas do PostgREST
+            rows = []
+            async for page in iter_pages(lambda: supabase.table('profiles').select(_PROFILE_COLUMNS), ('id',), False):
+                rows.extend(page)
+            ranking.load(rows)
+            _loaded_at = time.monotonic()
+    return ranking
+
+
+async def refresh_users(user_ids: Iterable) -> None:
+    """
+    Volta a ler os pontos destes utilizadores (uma query) e reposiciona-os.
+    Se o ranking ainda não foi pedido não faz nada: a primeira leitura já os apanha.
+    """
+    ids = list({str(u) for u in user_ids})
+    if _loaded_at is None or not ids:
+        return
+    try:
+        res = await supabase.table('profiles').select(_PROFILE_COLUMNS).in_('id', ids).execute()
+    except Exception:
+        return
+    found = set()
+    for row in res.data:
+        ranking.update(row)
+        found.add(str(row['id']))
+    for user_id in set(ids) - found:
+        ranking.remove(user_id)
+
+
+async def refresh_participants(participant_ids: Iterable) -> None:
+    """ Como refresh_users, mas a partir das participações validadas (id do participante). """
+    ids = list({str(p) for p in participant_ids})
+    if _loaded_at is None or not ids:
+        return
+    try:
+        res = await supabase.table('participants').select(f'user_id, profiles!participants_user_id_fkey({_PROFILE_COLUMNS})').in_('id', ids).execute()
+    except Exception:
+        return
+    for row in res.data:
+        if row.get('profiles'):
+            ranking.update(row['profiles'])
+
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"], dependencies=[Depends(auth.get_current_user)])
+
+
+@router.get("", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    role: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: AuthUser = Depends(auth.get_current_user),
+):
+    """ Ranking por pontos (geral ou de um cargo) e a posição do utilizador atual. """
+    board = await ensure_loaded()
+    return LeaderboardResponse(
+        role=role,
+        total=board.size(role),
+        entries=board.top(role, limit, offset),
+        me=board.rank(current_user.id, role),
+    )
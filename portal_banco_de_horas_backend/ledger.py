@@ -0,0 +1,108 @@
+# Ficheiro: ledger.py
+# Consultas ao ledger de pontos/horas (sql/ledger.sql): saldo numa data, extrato,
+# snapshots e reconciliação dos contadores de profiles com o ledger.
+# O saldo numa data lê um snapshot + os movimentos seguintes, nunca o histórico todo.
+# As tabelas e RPCs do ledger estão fechadas à chave pública: tudo passa pela
+# service_role key (SUPABASE_SERVICE_ROLE_KEY), depois da verificação de admin da rota.
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Response
+
+import auth
+from models import BalanceAsOf, BalanceDrift, BalanceStatement, LedgerEntry
+from pagination import paginate, page_rows, MAX_PAGE_SIZE
+from settings import settings
+from supabase_client import supabase
+
+logger = logging.getLogger("portal.ledger")
+
+router = APIRouter(prefix="/admin/ledger", tags=["Admin"], dependencies=[Depends(auth.get_current_admin_user)])
+
+
+async def balance_as_of(user_id: UUID, at: Optional[datetime] = None) -> BalanceAsOf:
+    at = at or datetime.now(timezone.utc)
+    res = await supabase.service_rpc('balance_as_of', {'p_user_id': str(user_id), 'p_at': at.isoformat()}).execute()
+    row = res.data[0] if res.data else {'points': 0, 'hours': 0}
+    return BalanceAsOf(user_id=user_id, at=at, **row)
+
+
+@router.get("/{uid}/balance", response_model=BalanceAsOf)
+async def get_balance_as_of(uid: UUID, at: Optional[datetime] = None):
+    """ Pontos e horas do utilizador num instante (por omissão, agora). """
+    return await balance_as_of(uid, at)
+
+
+@router.get("/{uid}/statement", response_model=BalanceStatement)
+async def get_statement(
+    uid: UUID,
+    response: Response,
+    date_from: datetime,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """ Extrato: saldo de abertura em date_from, movimentos até date_to e saldo de fecho. """
+    date_to = date_to or datetime.now(timezone.utc)
+    query = supabase.service_table('balance_ledger').select('*').eq('user_id', str(uid)) \
+        .gt('occurred_at', date_from.isoformat()).lte('occurred_at', date_to.isoformat())
+    opening, closing, res = await asyncio.gather(
+        balance_as_of(uid, date_from),
+        balance_as_of(uid, date_to),
+        paginate(query, ('occurred_at', 'id'), False, cursor, limit).execute(),
+    )
+    rows = page_rows(res.data, ('occurred_at', 'id'), limit, response)
+    return BalanceStatement(opening=opening, entries=[LedgerEntry.model_validate(r) for r in rows], closing=closing)
+
+
+async def take_snapshots() -> int:
+    res = await supabase.service_rpc('take_balance_snapshots', {}).execute()
+    return res.data or 0
+
+
+@router.post("/snapshots")
+async def run_snapshots():
+    """ Tira já um snapshot de quem teve movimentos desde o último. """
+    return {"snapshots": await take_snapshots()}
+
+
+@router.get("/reconcile", response_model=List[BalanceDrift])
+async def reconcile():
+    """ Utilizadores cujo contador em profiles não bate com o ledger (lista vazia = tudo certo). """
+    res = await supabase.service_rpc('reconcile_balances', {}).execute()
+    return [BalanceDrift.model_validate(r) for r in res.data]
+
+
+# Snapshots periódicos dentro do processo (opcional, ver LEDGER_SNAPSHOT_INTERVAL)
+_task: Optional[asyncio.Task] = None
+
+
+async def _snapshot_loop(interval: int) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            count = await take_snapshots()
+            logger.info("Snapshots de saldos: %s", count)
+        except Exception as e:
+            logger.warning("Falha ao tirar snapshots de saldos: %s", e)
+
+
+def start_snapshots() -> None:
+    global _task
+    if settings.LEDGER_SNAPSHOT_INTERVAL and _task is None:
+        _task = asyncio.create_task(_snapshot_loop(settings.LEDGER_SNAPSHOT_INTERVAL))
+
+
+async def stop_snapshots() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,24 +1,55 @@
 # Ficheiro: main.py
-from fastapi import FastAPI, HTTPException, status, Depends, APIRouter
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, status, Depends, APIRouter, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+import supabase_client
 from supabase_client import supabase
 from zoneinfo import ZoneInfo 
+from datetime import datetime, timezone
 
 
 # Importações
 from models import * 
-from gotrue.errors import AuthApiError
+from supabase_auth.errors import AuthApiError
 import auth 
-from gotrue.types import User as AuthUser
+from cache import caches, response_cache, cached_json_response, cached_value
+from supabase_auth.types import User as AuthUser
 import ferias
+import sync
+import events
+import leaderboard
+import ledger
+import user_import
+import proof_storage
+from idempotency import idempotency_key, run_once
+from pagination import paginate, page_rows, iter_pages, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from export import streaming_export
+from bulk import run_bounded
+from eligibility import index_for
+from serialization import list_response
+import metrics
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Um único cliente assíncrono (e pool de ligações) para todo o processo, já aquecido
+    await supabase_client.connect()
+    await events.start_realtime()
+    ledger.start_snapshots()
+    yield
+    await ledger.stop_snapshots()
+    await events.stop_realtime()
+    await supabase_client.disconnect()
 
 app = FastAPI(
     title="Portal Banco de Horas API",
     description="API para o sistema de gamificação da 14ª Regional",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan
 )
 
 # CORS
@@ -28,8 +59,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Latência por rota e por fase (auth, db, validate)
+app.middleware("http")(metrics.metrics_middleware)
+
 # --- Modelos Locais ---
 class AdminUserUpdate(BaseModel):
     role: str
@@ -49,28 +84,71 @@ class UserPasswordUpdate(BaseModel):
 
 # --- ROTAS PÚBLICAS ---
 @app.get("/")
-def read_root():
+async def read_root():
     return {"status": "online", "message": "Bem-vindo à API do Banco de Horas!"}
 
+# --- Leituras em cache (tabelas que só mudam quando o admin escreve) ---
+_roles_adapter = TypeAdapter(List[Role])
+_challenges_adapter = TypeAdapter(List[Challenge])
+_settings_adapter = TypeAdapter(AdminSettingsResponse)
+
+# Listas grandes: validação única com TypeAdapter (ver serialization.py)
+_requests_adapter = TypeAdapter(List[RequestResponse])
+_participants_adapter = TypeAdapter(List[ParticipantResponse])
+_admin_requests_adapter = TypeAdapter(List[AdminRequestDetails])
+_admin_participants_adapter = TypeAdapter(List[AdminParticipantDetails])
+_admin_users_adapter = TypeAdapter(List[AdminUserListResponse])
+_challenge_report_adapter = TypeAdapter(List[ChallengeReportRow])
+
+async def _load_roles():
+    res = await supabase.table('roles').select("*").order('name', desc=False).execute()
+    return res.data
+
+async def _load_challenges():
+    res = await supabase.table('challenges').select("*").order('created_at', desc=True).execute()
+    return res.data
+
+async def _load_active_challenges():
+    # Só os que ainda estão dentro do prazo (ou sem prazo); a elegibilidade é resolvida pelo índice
+    now = datetime.now(timezone.utc).isoformat()
+    res = await supabase.table('challenges').select("*").or_(f'due_at.is.null,due_at.gt."{now}"').order('created_at', desc=True).execute()
+    return res.data
+
+def invalidate_challenges():
+    response_cache.invalidate('challenges')
+    response_cache.invalidate('challenges:active')
+
+async def _load_settings():
+    res = await supabase.table('settings').select('*').eq('id', 1).single().execute()
+    return res.data
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """ Liveness: o processo está de pé (não depende do Supabase). """
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """ Readiness: o Supabase (PostgREST e Auth) responde agora. """
+    checks = await supabase_client.check()
+    body = {"status": "ready" if supabase_client.status["ready"] else "unavailable", "checks": checks}
+    return JSONResponse(body, status_code=200 if supabase_client.status["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """ Métricas no formato de texto do Prometheus. """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/roles", response_model=List[Role])
-def get_public_roles():
+async def get_public_roles(request: Request):
     try:
-        res = supabase.table('roles').select("*").order('name', desc=False).execute()
-        return [Role.model_validate(i) for i in res.data]
+        return await cached_json_response(request, 'roles', _load_roles, _roles_adapter)
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/challenges", response_model=List[Challenge], tags=["Challenges"])
-def get_challenges():
-    try:
-        response = supabase.table('challenges').select("*").order('created_at', desc=True).execute()
-        return [Challenge.model_validate(item) for item in response.data]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Ocorreu um erro interno.")
-
 @app.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def user_signup(credentials: UserCreate):
+async def user_signup(credentials: UserCreate):
     try:
-        session = supabase.auth.sign_up({"email": credentials.email, "password": credentials.password})
+        session = await supabase.auth.sign_up({"email": credentials.email, "password": credentials.password})
         new_user = session.user
         
         if not new_user:
@@ -84,7 +162,7 @@ def user_signup(credentials: UserCreate):
             "hours": 0,
             "email": credentials.email 
         }
-        supabase.table('profiles').insert(profile_data).execute()
+        await supabase.table('profiles').insert(profile_data).execute()
         return new_user
 
     except Exception as e:
@@ -94,9 +172,9 @@ def user_signup(credentials: UserCreate):
         raise HTTPException(status_code=500, detail=f"Erro interno: {error_message}")
 
 @app.post("/login", response_model=Token)
-def user_login(credentials: UserLogin):
+async def user_login(credentials: UserLogin):
     try:
-        session = supabase.auth.sign_in_with_password({"email": credentials.email, "password": credentials.password})
+        session = await supabase.auth.sign_in_with_password({"email": credentials.email, "password": credentials.password})
         return {"access_token": session.session.access_token, "token_type": "bearer"}
     except Exception as e:
         raise HTTPException(status_code=401, detail="Email ou senha incorretos.")
@@ -105,26 +183,60 @@ def user_login(credentials: UserLogin):
 user_router = APIRouter(prefix="/me", tags=["User"], dependencies=[Depends(auth.get_current_user)])
 
 @user_router.get("/", response_model=Profile)
-def read_users_me(current_user: AuthUser = Depends(auth.get_current_user)):
+async def read_users_me(current_user: AuthUser = Depends(auth.get_current_user)):
     try:
-        res = supabase.table('profiles').select("*").eq('id', str(current_user.id)).single().execute()
+        res = await supabase.table('profiles').select("*").eq('id', str(current_user.id)).single().execute()
         data = res.data
         if not data.get('email'): data['email'] = current_user.email
         return Profile.model_validate(data)
     except Exception: raise HTTPException(status_code=404, detail="Perfil não encontrado.")
 
+async def get_eligible_challenges(role: str, user_id: UUID) -> List[Challenge]:
+    active = await cached_value('challenges:active', _load_active_challenges, _challenges_adapter)
+    return index_for(active).for_user(role, user_id)
+
+@user_router.get("/dashboard", response_model=DashboardResponse)
+async def get_my_dashboard(current_user: AuthUser = Depends(auth.get_current_user)):
+    """ Junta num só pedido os dados do ecrã inicial (as leituras correm em paralelo). """
+    uid = str(current_user.id)
+    profile, requests_res, participations_res, balance_res, active = await asyncio.gather(
+        read_users_me(current_user),
+        supabase.table('requests').select("*").eq('user_id', uid).order('created_at', desc=True).execute(),
+        supabase.table('participants').select("*").eq('user_id', uid).execute(),
+        supabase.table('vacation_balances').select("days").eq('user_id', uid).execute(),
+        cached_value('challenges:active', _load_active_challenges, _challenges_adapter),
+    )
+    try:
+        settings = await cached_value('settings', _load_settings, _settings_adapter)
+    except Exception:
+        settings = AdminSettingsResponse(points_per_hour=10)
+
+    return DashboardResponse(
+        profile=profile,
+        requests=[RequestResponse.model_validate(i) for i in requests_res.data],
+        participations=[ParticipantResponse.model_validate(i) for i in participations_res.data],
+        settings=settings,
+        challenges=index_for(active).for_user(profile.role, profile.id),
+        vacation_days=balance_res.data[0]['days'] if balance_res.data else 0,
+    )
+
+@user_router.get("/challenges", response_model=List[Challenge])
+async def get_my_challenges(current_user: AuthUser = Depends(auth.get_current_user)):
+    """ Só os desafios a que o utilizador tem acesso (cargo ou lista de utilizadores) e ainda no prazo. """
+    profile = await read_users_me(current_user)
+    return await get_eligible_challenges(profile.role, profile.id)
+
 @user_router.get("/settings", response_model=AdminSettingsResponse)
-def get_user_settings(current_user: AuthUser = Depends(auth.get_current_user)):
+async def get_user_settings(request: Request, current_user: AuthUser = Depends(auth.get_current_user)):
     try:
-        res = supabase.table('settings').select('*').eq('id', 1).single().execute()
-        return AdminSettingsResponse.model_validate(res.data)
+        return await cached_json_response(request, 'settings', _load_settings, _settings_adapter)
     except Exception:
         return AdminSettingsResponse(points_per_hour=10)
 
 @user_router.put("/password")
-def update_my_password(data: UserPasswordUpdate, current_user: AuthUser = Depends(auth.get_current_user)):
+async def update_my_password(data: UserPasswordUpdate, current_user: AuthUser = Depends(auth.get_current_user)):
     try:
-        supabase.rpc('admin_reset_password', {
+        await supabase.rpc('admin_reset_password', {
             'p_user_id': str(current_user.id),
             'p_new_password': data.password
         }).execute()
@@ -133,136 +245,326 @@ def update_my_password(data: UserPasswordUpdate, current_user: AuthUser = Depend
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar senha: {str(e)}")
 
 @user_router.get("/participations", response_model=List[ParticipantResponse])
-def get_my_participations(current_user: AuthUser = Depends(auth.get_current_user)):
+async def get_my_participations(current_user: AuthUser = Depends(auth.get_current_user)):
     try:
-        res = supabase.table('participants').select("*").eq('user_id', str(current_user.id)).execute()
-        return [ParticipantResponse.model_validate(i) for i in res.data]
+        res = await supabase.table('participants').select("*").eq('user_id', str(current_user.id)).execute()
+        return list_response(_participants_adapter, res.data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @user_router.get("/requests", response_model=List[RequestResponse])
-def get_my_requests(current_user: AuthUser = Depends(auth.get_current_user)):
-    res = supabase.table('requests').select("*").eq('user_id', str(current_user.id)).order('created_at', desc=True).execute()
-    return [RequestResponse.model_validate(i) for i in res.data]
+async def get_my_requests(current_user: AuthUser = Depends(auth.get_current_user)):
+    res = await supabase.table('requests').select("*").eq('user_id', str(current_user.id)).order('created_at', desc=True).execute()
+    return list_response(_requests_adapter, res.data)
 
 @user_router.post("/requests", response_model=RequestResponse, status_code=status.HTTP_201_CREATED)
-def create_request(request_data: RequestCreate, current_user: AuthUser = Depends(auth.get_current_user)):
-    try:
-        new_request_data = {
-            "user_id": str(current_user.id), 
-            "type": request_data.type.value,
-            "hours": request_data.hours, 
-            "reason": request_data.reason,
-            "status": "pendente"
-        }
-        response = supabase.table('requests').insert(new_request_data).execute()
-        return RequestResponse.model_validate(response.data[0])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def create_request(
+    request_data: RequestCreate,
+    current_user: AuthUser = Depends(auth.get_current_user),
+    idem_key: Optional[str] = Depends(idempotency_key),
+):
+    # Só o insert fica dentro do run_once: o resultado guarda-se logo que o pedido existe
+    async def create():
+        try:
+            new_request_data = {
+                "user_id": str(current_user.id), 
+                "type": request_data.type.value,
+                "hours": request_data.hours, 
+                "reason": request_data.reason,
+                "status": "pendente"
+            }
+            response = await supabase.table('requests').insert(new_request_data).execute()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        events.publish('requests', 'INSERT', response.data[0])
+        return response.data[0]
+    # Repetições com a mesma Idempotency-Key devolvem o pedido já criado
+    row = await run_once((str(current_user.id), 'requests'), idem_key, request_data.model_dump_json(), create)
+    return RequestResponse.model_validate(row)
 
 @user_router.post("/convert", response_model=Profile)
-def convert_points(conversion_data: ConversionRequest, current_user: AuthUser = Depends(auth.get_current_user)):
-    try:
-        supabase.rpc('convert_points_to_hours', {
-            'p_user_id': str(current_user.id),
-            'p_hours_to_add': conversion_data.hours
-        }).execute()
-        return read_users_me(current_user)
-    except Exception as e:
-        error_msg = str(e)
-        if "Pontos insuficientes" in error_msg:
-             raise HTTPException(status_code=400, detail=error_msg)
-        raise HTTPException(status_code=500, detail=f"Erro na conversão: {error_msg}")
+async def convert_points(
+    conversion_data: ConversionRequest,
+    current_user: AuthUser = Depends(auth.get_current_user),
+    idem_key: Optional[str] = Depends(idempotency_key),
+):
+    # Só a RPC fica dentro do run_once: se a releitura do perfil falhar depois,
+    # repetir com a mesma chave não volta a descontar os pontos
+    async def convert():
+        try:
+            await supabase.rpc('convert_points_to_hours', {
+                'p_user_id': str(current_user.id),
+                'p_hours_to_add': conversion_data.hours
+            }).execute()
+        except Exception as e:
+            error_msg = str(e)
+            if "Pontos insuficientes" in error_msg:
+                 raise HTTPException(status_code=400, detail=error_msg)
+            raise HTTPException(status_code=500, detail=f"Erro na conversão: {error_msg}")
+        return True
+    # Uma conversão repetida com a mesma chave não desconta os pontos duas vezes
+    await run_once((str(current_user.id), 'convert'), idem_key, conversion_data.model_dump_json(), convert)
+    await leaderboard.refresh_users([current_user.id])
+    return await read_users_me(current_user)
 
 @user_router.post("/challenges/{cid}/enroll", response_model=ParticipantResponse)
-def enroll_in_challenge(cid: UUID, current_user: AuthUser = Depends(auth.get_current_user)):
+async def enroll_in_challenge(cid: UUID, current_user: AuthUser = Depends(auth.get_current_user)):
+    # Uma só ida ao banco: a chave única (user_id, challenge_id) decide (sql/participants_unique.sql).
+    # Com ignore_duplicates, uma inscrição repetida não devolve linha nenhuma.
+    new_enrollment = {"user_id": str(current_user.id), "challenge_id": str(cid), "status": "inscrito"}
     try:
-        existing = supabase.table('participants').select("id").eq('user_id', str(current_user.id)).eq('challenge_id', str(cid)).execute()
-        if existing.data:
-            raise HTTPException(status_code=400, detail="Já inscrito.")
-        
-        new_enrollment = {"user_id": str(current_user.id), "challenge_id": str(cid), "status": "inscrito"}
-        response = supabase.table('participants').insert(new_enrollment).execute()
-        return ParticipantResponse.model_validate(response.data[0])
+        response = await supabase.table('participants') \
+            .upsert(new_enrollment, on_conflict='user_id,challenge_id', ignore_duplicates=True) \
+            .execute()
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Já inscrito.")
+    events.publish('participants', 'INSERT', response.data[0])
+    return ParticipantResponse.model_validate(response.data[0])
 
 @user_router.post("/challenges/{cid}/proof", response_model=ParticipantResponse)
-def submit_challenge_proof(cid: UUID, proof_data: ProofSubmit, current_user: AuthUser = Depends(auth.get_current_user)):
+async def submit_challenge_proof(cid: UUID, proof_data: ProofSubmit, current_user: AuthUser = Depends(auth.get_current_user)):
+    # O ficheiro tem de ter sido enviado com um URL pedido por este utilizador para este desafio
+    if proof_data.proof_path and (".." in proof_data.proof_path or not proof_data.proof_path.startswith(proof_storage.proof_prefix(current_user.id, cid))):
+        raise HTTPException(status_code=400, detail="Ficheiro de prova inválido.")
+    if proof_data.proof_path:
+        try:
+            uploaded = await proof_storage.exists(proof_data.proof_path)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Erro no Storage: {str(e)}")
+        if not uploaded:
+            raise HTTPException(status_code=400, detail="Ficheiro de prova não encontrado: envie-o antes de submeter.")
     try:
-        response = supabase.table('participants') \
-            .update({"status": "enviado", "proof_url": proof_data.proof_url}) \
+        response = await supabase.table('participants') \
+            .update({"status": "enviado", "proof_url": proof_data.proof_url, "proof_path": proof_data.proof_path}) \
             .eq('user_id', str(current_user.id)) \
             .eq('challenge_id', str(cid)) \
             .eq('status', 'inscrito') \
             .execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Participação não encontrada ou já enviada.")
+        events.publish('participants', 'UPDATE', response.data[0])
         return ParticipantResponse.model_validate(response.data[0])
+    except HTTPException as e: raise e
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
+@user_router.post("/challenges/{cid}/proof/upload-url", response_model=ProofUploadResponse)
+async def create_proof_upload_url(cid: UUID, data: ProofUploadRequest, current_user: AuthUser = Depends(auth.get_current_user)):
+    """
+    URL assinado para enviar o ficheiro da prova diretamente para o Storage.
+    Depois do upload, enviar o 'path' devolvido em POST /me/challenges/{cid}/proof.
+    """
+    existing = await supabase.table('participants').select("id").eq('user_id', str(current_user.id)).eq('challenge_id', str(cid)).eq('status', 'inscrito').execute()
+    if not existing.data:
+        raise HTTPException(status_code=404, detail="Participação não encontrada ou já enviada.")
+    try:
+        return await proof_storage.create_upload_url(current_user.id, cid, data.filename)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro no Storage: {str(e)}")
+
 app.include_router(user_router) 
 
 # --- ROTAS DE ADMIN ---
 admin_router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(auth.get_current_admin_user)])
 
 @admin_router.get("/settings", response_model=AdminSettingsResponse)
-def admin_get_settings():
-    res = supabase.table('settings').select('*').eq('id', 1).single().execute()
-    return AdminSettingsResponse.model_validate(res.data)
+async def admin_get_settings(request: Request):
+    return await cached_json_response(request, 'settings', _load_settings, _settings_adapter)
 
 @admin_router.put("/settings", response_model=AdminSettingsResponse)
-def admin_update_settings(settings: AdminSettingsUpdate):
-    res = supabase.table('settings').update(settings.model_dump(mode='json')).eq('id', 1).execute()
+async def admin_update_settings(settings: AdminSettingsUpdate):
+    res = await supabase.table('settings').update(settings.model_dump(mode='json')).eq('id', 1).execute()
+    response_cache.invalidate('settings')
     return AdminSettingsResponse.model_validate(res.data[0])
 
 @admin_router.get("/requests", response_model=List[AdminRequestDetails])
-def admin_get_all_requests():
-    res = supabase.table('requests').select('*, profiles!requests_user_id_fkey(*)').order('created_at', desc=True).execute()
-    return [AdminRequestDetails.model_validate(item) for item in res.data]
+async def admin_get_all_requests(
+    response: Response,
+    status: Optional[RequestStatus] = None,
+    user_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    query = supabase.table('requests').select('*, profiles!requests_user_id_fkey(*)')
+    if status: query = query.eq('status', status.value)
+    if user_id: query = query.eq('user_id', str(user_id))
+    if date_from: query = query.gte('created_at', date_from.isoformat())
+    if date_to: query = query.lte('created_at', date_to.isoformat())
+    res = await paginate(query, ('created_at', 'id'), True, cursor, limit).execute()
+    rows = page_rows(res.data, ('created_at', 'id'), limit, response)
+    return list_response(_admin_requests_adapter, rows, response)
 
 @admin_router.get("/users/{uid}/requests", response_model=List[RequestResponse])
-def admin_get_user_requests(uid: UUID):
-    res = supabase.table('requests').select("*").eq('user_id', str(uid)).order('created_at', desc=True).execute()
-    return [RequestResponse.model_validate(i) for i in res.data]
+async def admin_get_user_requests(uid: UUID):
+    res = await supabase.table('requests').select("*").eq('user_id', str(uid)).order('created_at', desc=True).execute()
+    return list_response(_requests_adapter, res.data)
 
 @admin_router.post("/requests/{rid}/process", status_code=status.HTTP_204_NO_CONTENT)
-def admin_process_request(rid: UUID, update_data: AdminRequestStatusUpdate):
-    supabase.rpc('process_request', {'p_request_id': str(rid), 'p_new_status': update_data.status.value}).execute()
+async def admin_process_request(rid: UUID, update_data: AdminRequestStatusUpdate):
+    await supabase.rpc('process_request', {'p_request_id': str(rid), 'p_new_status': update_data.status.value}).execute()
+    events.publish('requests', 'UPDATE', {'id': str(rid), 'status': update_data.status.value})
+
+@admin_router.post("/requests/process", response_model=List[BulkItemResult])
+async def admin_process_requests_bulk(data: AdminBulkRequestProcess):
+    """ Processa vários pedidos numa só chamada; devolve o resultado de cada um. """
+    async def process(item: AdminBulkRequestItem) -> BulkItemResult:
+        try:
+            await supabase.rpc('process_request', {'p_request_id': str(item.id), 'p_new_status': item.status.value}).execute()
+            events.publish('requests', 'UPDATE', {'id': str(item.id), 'status': item.status.value})
+            return BulkItemResult(id=str(item.id), ok=True)
+        except Exception as e:
+            return BulkItemResult(id=str(item.id), ok=False, error=str(e))
+    return await run_bounded(data.items, process, key=lambda i: i.id)
+
+@admin_router.get("/challenges", response_model=List[Challenge])
+async def admin_get_challenges(request: Request):
+    """ Catálogo completo (inclui allowed_user_ids); os utilizadores usam GET /me/challenges. """
+    try:
+        return await cached_json_response(request, 'challenges', _load_challenges, _challenges_adapter)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Ocorreu um erro interno.")
 
 @admin_router.post("/challenges", response_model=Challenge, status_code=status.HTTP_201_CREATED)
-def admin_create_challenge(challenge_data: AdminChallengeCreate):
+async def admin_create_challenge(challenge_data: AdminChallengeCreate):
     try:
         if challenge_data.due_at:
             aware_date = challenge_data.due_at.replace(tzinfo=ZoneInfo("America/Sao_Paulo"))
             challenge_data.due_at = aware_date
-        res = supabase.table('challenges').insert(challenge_data.model_dump(mode='json')).execute()
+        res = await supabase.table('challenges').insert(challenge_data.model_dump(mode='json')).execute()
+        invalidate_challenges()
         return Challenge.model_validate(res.data[0])
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
+@admin_router.get("/challenges/report", response_model=List[ChallengeReportRow])
+async def admin_challenges_report():
+    """ Contagens por estado, pontos atribuídos e taxa de conclusão de cada desafio (calculados no banco). """
+    res = await supabase.rpc('challenge_report', {}).execute()
+    return list_response(_challenge_report_adapter, res.data)
+
+@admin_router.get("/challenges/{cid}/report", response_model=ChallengeReportDetail)
+async def admin_challenge_report_detail(cid: UUID):
+    """ Detalhe de um desafio: os totais e a mesma divisão por cargo de quem participa. """
+    totals, by_role = await asyncio.gather(
+        supabase.rpc('challenge_report', {'p_challenge_id': str(cid)}).execute(),
+        supabase.rpc('challenge_report_by_role', {'p_challenge_id': str(cid)}).execute(),
+    )
+    if not totals.data:
+        raise HTTPException(status_code=404, detail="Desafio não encontrado.")
+    return ChallengeReportDetail(**totals.data[0], by_role=by_role.data)
+
 @admin_router.delete("/challenges/{cid}", status_code=status.HTTP_204_NO_CONTENT)
-def admin_delete_challenge(cid: UUID):
-    supabase.table('challenges').delete().eq('id', str(cid)).execute()
+async def admin_delete_challenge(cid: UUID):
+    await supabase.table('challenges').delete().eq('id', str(cid)).execute()
+    invalidate_challenges()
 
 @admin_router.get("/participants/all", response_model=List[AdminParticipantDetails])
-def admin_get_all_participants():
-    res = supabase.table('participants').select('*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)').order('created_at', desc=True).execute()
-    return [AdminParticipantDetails.model_validate(item) for item in res.data]
+async def admin_get_all_participants(
+    response: Response,
+    status: Optional[ParticipantStatus] = None,
+    user_id: Optional[UUID] = None,
+    challenge_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    query = supabase.table('participants').select('*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)')
+    if status: query = query.eq('status', status.value)
+    if user_id: query = query.eq('user_id', str(user_id))
+    if challenge_id: query = query.eq('challenge_id', str(challenge_id))
+    if date_from: query = query.gte('created_at', date_from.isoformat())
+    if date_to: query = query.lte('created_at', date_to.isoformat())
+    res = await paginate(query, ('created_at', 'id'), True, cursor, limit).execute()
+    rows = page_rows(res.data, ('created_at', 'id'), limit, response)
+    return list_response(_admin_participants_adapter, rows, response)
+
+def _flatten_participant(row: dict) -> dict:
+    profile = row.pop('profiles', None) or {}
+    challenge = row.pop('challenges', None) or {}
+    row.update({
+        'user_name': profile.get('name'), 'user_email': profile.get('email'), 'user_role': profile.get('role'),
+        'challenge_title': challenge.get('title'), 'challenge_points': challenge.get('points'),
+    })
+    return row
+
+@admin_router.get("/participants/export")
+async def admin_export_participants(
+    format: str = "csv",
+    status: Optional[ParticipantStatus] = None,
+    challenge_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    """ Exporta as participações (relatório de desafios) em CSV/NDJSON, em streaming. """
+    def base_query():
+        query = supabase.table('participants').select('*, profiles!participants_user_id_fkey(name, email, role), challenges!participants_challenge_id_fkey(title, points)')
+        if status: query = query.eq('status', status.value)
+        if challenge_id: query = query.eq('challenge_id', str(challenge_id))
+        if date_from: query = query.gte('created_at', date_from.isoformat())
+        if date_to: query = query.lte('created_at', date_to.isoformat())
+        return query
+
+    return streaming_export(
+        iter_pages(base_query, ('created_at', 'id'), True),
+        format,
+        ['id', 'created_at', 'status', 'user_id', 'user_name', 'user_email', 'user_role',
+         'challenge_id', 'challenge_title', 'challenge_points', 'proof_url', 'proof_path'],
+        'relatorio_desafios',
+        transform=_flatten_participant,
+    )
 
 @admin_router.get("/participants/pending", response_model=List[AdminParticipantDetails])
-def admin_get_pending_validations():
-    res = supabase.table('participants').select('*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)').eq('status', 'enviado').order('created_at', desc=False).execute()
-    return [AdminParticipantDetails.model_validate(item) for item in res.data]
+async def admin_get_pending_validations():
+    res = await supabase.table('participants').select('*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)').eq('status', 'enviado').order('created_at', desc=False).execute()
+    return list_response(_admin_participants_adapter, res.data)
+
+@admin_router.post("/proofs/signed-urls", response_model=Dict[str, Optional[str]])
+async def admin_proof_signed_urls(data: AdminProofUrlsRequest):
+    """ URLs de leitura temporários para as provas (path -> URL) de um ecrã inteiro, numa só chamada. """
+    try:
+        return await proof_storage.signed_read_urls(data.paths)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro no Storage: {str(e)}")
 
 @admin_router.post("/participants/{pid}/validate", status_code=status.HTTP_204_NO_CONTENT)
-def admin_validate_participation(pid: UUID, validation_data: AdminParticipantValidation):
-    supabase.rpc('validate_participation', {'p_participant_id': str(pid), 'p_approved': validation_data.approved}).execute()
+async def admin_validate_participation(pid: UUID, validation_data: AdminParticipantValidation):
+    await supabase.rpc('validate_participation', {'p_participant_id': str(pid), 'p_approved': validation_data.approved}).execute()
+    events.publish('participants', 'UPDATE', {'id': str(pid), 'status': 'validado' if validation_data.approved else 'recusado'})
+    if validation_data.approved:
+        await leaderboard.refresh_participants([pid])
+
+@admin_router.post("/participants/validate", response_model=List[BulkItemResult])
+async def admin_validate_participations_bulk(data: AdminBulkParticipantValidation):
+    """ Valida/recusa várias participações numa só chamada; devolve o resultado de cada uma. """
+    async def validate(item: AdminBulkValidationItem) -> BulkItemResult:
+        try:
+            await supabase.rpc('validate_participation', {'p_participant_id': str(item.id), 'p_approved': item.approved}).execute()
+            events.publish('participants', 'UPDATE', {'id': str(item.id), 'status': 'validado' if item.approved else 'recusado'})
+            return BulkItemResult(id=str(item.id), ok=True)
+        except Exception as e:
+            return BulkItemResult(id=str(item.id), ok=False, error=str(e))
+    results = await run_bounded(data.items, validate, key=lambda i: i.id)
+    # Um só refresh do ranking para todas as participações aprovadas
+    await leaderboard.refresh_participants(i.id for i, r in zip(data.items, results) if r.ok and i.approved)
+    return results
 
 @admin_router.get("/users", response_model=List[AdminUserListResponse])
-def admin_list_users():
-    res = supabase.table('profiles').select('*, vacation_balances(days)').order('name', desc=False).execute()
-    users = []
-    for i in res.data:
-        vac_bal = i.get('vacation_balances')
+async def admin_list_users(
+    response: Response,
+    role: Optional[str] = None,
+    is_admin: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    query = supabase.table('profiles').select('*, vacation_balances(days)')
+    if role: query = query.eq('role', role)
+    if is_admin is not None: query = query.eq('is_admin', is_admin)
+    res = await paginate(query, ('name', 'id'), False, cursor, limit).execute()
+    users = page_rows(res.data, ('name', 'id'), limit, response)
+    for i in users:
+        vac_bal = i.pop('vacation_balances', None)
         days = 0
         if vac_bal:
             if isinstance(vac_bal, list) and len(vac_bal) > 0:
@@ -270,37 +572,53 @@ def admin_list_users():
             elif isinstance(vac_bal, dict):
                 days = vac_bal.get('days', 0)
         i['vacation_days'] = days
-        users.append(AdminUserListResponse.model_validate(i))
-    return users
+    return list_response(_admin_users_adapter, users, response)
 
 @admin_router.put("/users/{uid}", response_model=Profile)
-def admin_update_user(uid: UUID, user_data: AdminUserUpdate):
-    res = supabase.table('profiles').update(user_data.model_dump(exclude_unset=True)).eq('id', str(uid)).execute()
+async def admin_update_user(uid: UUID, user_data: AdminUserUpdate):
+    res = await supabase.table('profiles').update(user_data.model_dump(exclude_unset=True)).eq('id', str(uid)).execute()
+    auth.invalidate_profile(uid)
+    if res.data: leaderboard.ranking.update(res.data[0])
     return Profile.model_validate(res.data[0])
 
 @admin_router.delete("/users/{uid}", status_code=status.HTTP_204_NO_CONTENT)
-def admin_delete_user(uid: UUID):
-    supabase.rpc('admin_delete_user', {'p_user_id': str(uid)}).execute()
+async def admin_delete_user(uid: UUID):
+    await supabase.rpc('admin_delete_user', {'p_user_id': str(uid)}).execute()
+    auth.invalidate_profile(uid)
+    leaderboard.ranking.remove(str(uid))
 
 @admin_router.post("/users/{uid}/reset_password")
-def admin_reset_user_password(uid: UUID, data: AdminPasswordReset):
-    supabase.rpc('admin_reset_password', {'p_user_id': str(uid), 'p_new_password': data.new_password}).execute()
+async def admin_reset_user_password(uid: UUID, data: AdminPasswordReset):
+    await supabase.rpc('admin_reset_password', {'p_user_id': str(uid), 'p_new_password': data.new_password}).execute()
     return {"message": "Senha alterada com sucesso."}
 
 @admin_router.post("/users/{uid}/adjust")
-def admin_adjust_hours(uid: UUID, data: AdminAdjustment):
-    supabase.rpc('admin_add_hours', {'p_user_id': str(uid), 'p_hours': data.hours, 'p_reason': data.reason}).execute()
+async def admin_adjust_hours(uid: UUID, data: AdminAdjustment):
+    await supabase.rpc('admin_add_hours', {'p_user_id': str(uid), 'p_hours': data.hours, 'p_reason': data.reason}).execute()
+    await leaderboard.refresh_users([uid])
     return {"message": "Ajuste realizado."}
 
 @admin_router.post("/roles")
-def add_role(role: RoleBase):
-    supabase.table('roles').insert({"name": role.name}).execute()
+async def add_role(role: RoleBase):
+    await supabase.table('roles').insert({"name": role.name}).execute()
+    response_cache.invalidate('roles')
     return {"message": "Cargo criado."}
 
 @admin_router.delete("/roles/{rid}")
-def delete_role(rid: UUID):
-    supabase.table('roles').delete().eq('id', str(rid)).execute()
+async def delete_role(rid: UUID):
+    await supabase.table('roles').delete().eq('id', str(rid)).execute()
+    response_cache.invalidate('roles')
     return {"message": "Cargo apagado."}
 
+@admin_router.get("/cache/stats")
+async def admin_cache_stats():
+    """ Contadores de acertos/falhas das caches em memória deste processo. """
+    return {name: c.stats() for name, c in caches.items()}
+
 app.include_router(admin_router)
-app.include_router(ferias.router)
\ No newline at end of file
+app.include_router(ferias.router)
+app.include_router(sync.router)
+app.include_router(events.router)
+app.include_router(leaderboard.router)
+app.include_router(ledger.router)
+app.include_router(user_import.router)
\ No newline at end of file
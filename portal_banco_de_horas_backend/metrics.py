@@ -0,0 +1,188 @@
+# Ficheiro: metrics.py
+# Métricas de latência (formato de texto do Prometheus) e registo de pedidos lentos.
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from settings import settings
+
+logger = logging.getLogger("portal.slow_requests")
+
+# Limites dos "buckets" dos histogramas, em segundos
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [contagem por bucket..., soma, total]
+                series = self._series[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(BUCKETS, series):
+                    lines.append(f"{self.name}_bucket{_fmt(key + (('le', str(bound)),))} {count}")
+                lines.append(f"{self.name}_bucket{_fmt(key + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_fmt(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_fmt(key)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt(key)} {value}")
+        return "\n".join(lines)
+
+
+def _fmt(labels: Labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + inner + "}"
+
+
+http_duration = Histogram("http_request_duration_seconds", "Duração dos pedidos HTTP por rota.")
+http_requests = Counter("http_requests_total", "Pedidos HTTP por rota e código de resposta.")
+db_duration = Histogram("supabase_query_duration_seconds", "Duração das queries/RPCs ao Supabase.")
+db_rows = Counter("supabase_query_rows_total", "Linhas devolvidas pelas queries/RPCs ao Supabase.")
+db_errors = Counter("supabase_query_errors_total", "Erros nas queries/RPCs ao Supabase.")
+phase_duration = Histogram("request_phase_duration_seconds", "Tempo gasto em cada fase do pedido (auth, db, validate).")
+
+# Tempo acumulado por fase no pedido em curso (None fora de um pedido HTTP)
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+def add_phase(name: str, seconds: float) -> None:
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """ Mede um bloco de código como fase do pedido atual (ex.: 'validate'). """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - start)
+
+
+def observe_db(kind: str, target: str, seconds: float, rows: int, error: bool = False) -> None:
+    db_duration.observe(seconds, kind=kind, target=target)
+    if error:
+        db_errors.inc(kind=kind, target=target)
+    else:
+        db_rows.inc(rows, kind=kind, target=target)
+    add_phase("db", seconds)
+
+
+class InstrumentedQuery:
+    """
+    Envolve um builder do postgrest e mede o execute(). Os métodos encadeados
+    (select, eq, order, ...) devolvem builders que continuam a ser medidos.
+    """
+    __slots__ = ("_query", "_kind", "_target")
+
+    def __init__(self, query, kind: str, target: str):
+        self._query = query
+        self._kind = kind
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return InstrumentedQuery(result, self._kind, self._target)
+            return result
+        return call
+
+    async def _execute(self):
+        start = time.perf_counter()
+        try:
+            res = await self._query.execute()
+        except Exception:
+            observe_db(self._kind, self._target, time.perf_counter() - start, 0, error=True)
+            raise
+        data = getattr(res, "data", None)
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        observe_db(self._kind, self._target, time.perf_counter() - start, rows)
+        return res
+
+
+async def metrics_middleware(request, call_next):
+    """ Mede cada pedido HTTP e, se ativado, regista os pedidos lentos com o detalhe por fase. """
+    phases: Dict[str, float] = {}
+    token = _phases.set(phases)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        _phases.reset(token)
+        route = request.scope.get("route")
+        path = getattr(route, "path", "desconhecida")
+        http_duration.observe(elapsed, method=request.method, route=path)
+        http_requests.inc(method=request.method, route=path, status=str(status_code))
+        for name, seconds in phases.items():
+            phase_duration.observe(seconds, phase=name)
+        if settings.SLOW_REQUEST_MS is not None and elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            detail = " ".join(f"{k}={v * 1000:.1f}ms" for k, v in sorted(phases.items()))
+            logger.warning("Pedido lento: %s %s %s %.1fms %s", request.method, path, status_code, elapsed * 1000, detail)
+
+
+def render() -> str:
+    """ Todas as métricas no formato de texto do Prometheus. """
+    from cache import caches
+    parts = [m.render() for m in (http_duration, http_requests, db_duration, db_rows, db_errors, phase_duration)]
+    cache_lines = ["# HELP cache_requests_total Acertos/falhas das caches em memória.", "# TYPE cache_requests_total counter"]
+    for name, c in sorted(caches.items()):
+        cache_lines.append(f'cache_requests_total{{cache="{name}",result="hit"}} {c.hits}')
+        cache_lines.append(f'cache_requests_total{{cache="{name}",result="miss"}} {c.misses}')
+    parts.append("\n".join(cache_lines))
+    return "\n".join(parts) + "\n"
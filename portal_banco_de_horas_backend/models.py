@@ -1,8 +1,8 @@
 # Ficheiro: models.py
 # (Versão com Modelo de Cargos - Roles)
 
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Generic, List, Optional, TypeVar
 from datetime import datetime
 from uuid import UUID
 from enum import Enum 
@@ -54,9 +54,19 @@ class Config: from_attributes = True
 
 # --- Modelos de Participação ---
 class ParticipantStatus(str, Enum): inscrito = "inscrito"; enviado = "enviado"; validado = "validado"; recusado = "recusado"
-class ParticipantResponse(BaseModel): id: UUID; challenge_id: UUID; user_id: UUID; status: ParticipantStatus; proof_url: Optional[str] = None; created_at: datetime
+class ParticipantResponse(BaseModel): id: UUID; challenge_id: UUID; user_id: UUID; status: ParticipantStatus; proof_url: Optional[str] = None; proof_path: Optional[str] = None; created_at: datetime
 class Config: from_attributes = True
-class ProofSubmit(BaseModel): proof_url: str
+class ProofSubmit(BaseModel):
+    # Link externo (como antes) ou chave do ficheiro enviado para o Storage (proof_path)
+    proof_url: Optional[str] = None
+    proof_path: Optional[str] = None
+    @model_validator(mode="after")
+    def _link_ou_ficheiro(self):
+        if not self.proof_url and not self.proof_path:
+            raise ValueError("Indique proof_url ou proof_path.")
+        return self
+class ProofUploadRequest(BaseModel): filename: str = Field(min_length=1, max_length=200)
+class ProofUploadResponse(BaseModel): bucket: str; path: str; signed_url: str; token: str
 class ConversionRequest(BaseModel): hours: int = Field(gt=0)
 
 # --- Modelos Admin ---
@@ -69,5 +79,118 @@ class AdminSettingsUpdate(BaseModel): points_per_hour: int = Field(gt=0)
 class AdminRequestDetails(RequestResponse): profiles: Optional[Profile] = None
 class AdminParticipantDetails(ParticipantResponse): profiles: Optional[Profile] = None; challenges: Optional[Challenge] = None
 
+# --- Operações em lote do admin ---
+class AdminBulkRequestItem(BaseModel): id: UUID; status: RequestStatus
+class AdminBulkRequestProcess(BaseModel): items: List[AdminBulkRequestItem] = Field(min_length=1, max_length=1000)
+class AdminBulkValidationItem(BaseModel): id: UUID; approved: bool
+class AdminBulkParticipantValidation(BaseModel): items: List[AdminBulkValidationItem] = Field(min_length=1, max_length=1000)
+class BulkItemResult(BaseModel): id: str; ok: bool; error: Optional[str] = None
+class AdminProofUrlsRequest(BaseModel): paths: List[str] = Field(min_length=1, max_length=1000)
+
 class AdminUserListResponse(Profile):
-    vacation_days: int = 0
\ No newline at end of file
+    vacation_days: int = 0
+
+# --- Importação de utilizadores em lote (CSV/JSON) ---
+class AdminImportUser(BaseModel):
+    email: EmailStr
+    name: str = Field(min_length=1)
+    password: str = Field(min_length=6)
+    role: Optional[str] = "Analista"
+    vacation_days: int = Field(0, ge=0)
+
+class UserImportResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str  # "criado", "existente" ou "erro"
+    user_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+# --- Relatório de desafios (agregado no banco, ver sql/challenge_report.sql) ---
+class ChallengeStatusCounts(BaseModel):
+    total: int = 0
+    inscrito: int = 0
+    enviado: int = 0
+    validado: int = 0
+    recusado: int = 0
+    points_awarded: int = 0
+    completion_rate: Optional[float] = None
+
+class ChallengeReportRow(ChallengeStatusCounts):
+    challenge_id: UUID
+    title: str
+    points: int
+    due_at: Optional[datetime] = None
+    created_at: datetime
+
+class ChallengeRoleReport(ChallengeStatusCounts):
+    role: Optional[str] = None
+
+class ChallengeReportDetail(ChallengeReportRow):
+    by_role: List[ChallengeRoleReport] = []
+
+# --- Modelo do Dashboard (tudo o que o ecrã inicial precisa, num só pedido) ---
+class DashboardResponse(BaseModel):
+    profile: Profile
+    requests: List[RequestResponse]
+    participations: List[ParticipantResponse]
+    settings: AdminSettingsResponse
+    challenges: List[Challenge]
+    vacation_days: int = 0
+
+# --- Ranking de pontos ---
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: UUID
+    name: str
+    role: Optional[str] = None
+    points: int
+
+class LeaderboardResponse(BaseModel):
+    role: Optional[str] = None
+    total: int
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardEntry] = None
+
+# --- Ledger de pontos/horas (ver sql/ledger.sql) ---
+class BalanceAsOf(BaseModel):
+    user_id: UUID
+    at: datetime
+    points: int
+    hours: int
+    snapshot_at: Optional[datetime] = None
+    tail_events: int = 0
+
+class LedgerEntry(BaseModel):
+    id: int
+    user_id: UUID
+    occurred_at: datetime
+    points_delta: int
+    hours_delta: int
+    source: str
+
+class BalanceStatement(BaseModel):
+    opening: BalanceAsOf
+    entries: List[LedgerEntry]
+    closing: BalanceAsOf
+
+class BalanceDrift(BaseModel):
+    user_id: UUID
+    points: int
+    hours: int
+    ledger_points: int
+    ledger_hours: int
+
+# --- Eventos em tempo real do admin (events.py) ---
+# Bilhete de curta duração para abrir o stream SSE
+class EventsTicket(BaseModel): ticket: str; expires_in: int
+
+# --- Sincronização incremental (linhas alteradas + lápides desde um instante) ---
+T = TypeVar("T")
+
+class SyncResponse(BaseModel, Generic[T]):
+    changed: List[T]
+    deleted: List[UUID]
+    watermark: Optional[datetime] = None
+    # Posição keyset a reenviar no pedido seguinte (?cursor=)
+    cursor: Optional[str] = None
+    has_more: bool = False
@@ -0,0 +1,97 @@
+# Ficheiro: pagination.py
+# Paginação por cursor (keyset) para as listas grandes do admin.
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+from settings import settings
+
+# Limite máximo de linhas por página (abaixo do limite de linhas do PostgREST)
+MAX_PAGE_SIZE = 500
+# Sem 'limit' as listas também são paginadas: nunca se devolve a tabela inteira
+DEFAULT_PAGE_SIZE = min(settings.DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+# Cabeçalho onde devolvemos o cursor da página seguinte
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit: Optional[int]) -> int:
+    """ Linhas por página: o 'limit' pedido (até MAX_PAGE_SIZE) ou DEFAULT_PAGE_SIZE. """
+    return min(limit, MAX_PAGE_SIZE) if limit else DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(row: dict, columns: Sequence[str]) -> str:
+    """ Transforma os valores das colunas de ordenação da última linha num cursor opaco. """
+    raw = json.dumps([row.get(c) for c in columns], default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence[str]) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    return values
+
+
+def _quote(value: Any) -> str:
+    # Valores entre aspas para que ':' , ',' e '+' não partam o filtro 'or' do PostgREST
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def after(query, columns: Sequence[str], values: Sequence[Any], desc: bool = False):
+    """ Filtro keyset: só as linhas que vêm depois de `values` na ordem das colunas. """
+    op = "lt" if desc else "gt"
+    # (c1 op v1) or (c1 = v1 and c2 op v2) or ...
+    branches = []
+    for i, column in enumerate(columns):
+        equal = [f"{c}.eq.{_quote(v)}" for c, v in zip(columns[:i], values[:i])]
+        cond = f"{column}.{op}.{_quote(values[i])}"
+        branches.append(f"and({','.join(equal + [cond])})" if equal else cond)
+    return query.or_(",".join(branches))
+
+
+def paginate(query, columns: Sequence[str], desc: bool, cursor: Optional[str], limit: Optional[int]):
+    """
+    Aplica ordenação estável pelas colunas (a última deve ser única, ex.: 'id')
+    e, havendo cursor, o filtro keyset "linhas depois da última já vista".
+    Pede limit + 1 linhas (sem limit, DEFAULT_PAGE_SIZE + 1) para sabermos se existe página seguinte.
+    """
+    for column in columns:
+        query = query.order(column, desc=desc)
+
+    if cursor:
+        query = after(query, columns, decode_cursor(cursor, columns), desc)
+
+    return query.limit(page_size(limit) + 1)
+
+
+def page_rows(rows: list, columns: Sequence[str], limit: Optional[int], response: Response) -> list:
+    """ Corta a linha extra e, se houver mais dados, devolve o cursor no cabeçalho. """
+    limit = page_size(limit)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1], columns)
+    return rows
+
+
+async def iter_pages(make_query, columns: Sequence[str], desc: bool, batch_size: int = MAX_PAGE_SIZE):
+    """
+    Percorre uma tabela inteira em páginas keyset, devolvendo uma lista de linhas
+    de cada vez. `make_query` cria a query base (com select e filtros) a cada página.
+    """
+    cursor = None
+    while True:
+        res = await paginate(make_query(), columns, desc, cursor, batch_size).execute()
+        rows = res.data[:batch_size]
+        if rows:
+            yield rows
+        if len(res.data) <= batch_size:
+            return
+        cursor = encode_cursor(rows[-1], columns)
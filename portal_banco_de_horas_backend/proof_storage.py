@@ -0,0 +1,71 @@
+# Ficheiro: proof_storage.py
+# Provas dos desafios guardadas no Supabase Storage (bucket privado, sql/proof_storage.sql).
+#
+# A API só assina URLs: o browser envia o ficheiro diretamente para o Storage
+# (URL de upload assinado) e o admin lê-o por um URL de leitura temporário.
+# Os bytes nunca passam pelos workers da API.
+# Todas as chamadas ao Storage usam a service_role key (SUPABASE_SERVICE_ROLE_KEY).
+
+import os
+import uuid
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from models import ProofUploadResponse
+from settings import settings
+from supabase_client import supabase
+
+
+def proof_prefix(user_id, challenge_id) -> str:
+    """ Cada utilizador só pode registar ficheiros debaixo do seu prefixo. """
+    return f"{user_id}/{challenge_id}/"
+
+
+def _extension(filename: str) -> str:
+    ext = os.path.splitext(os.path.basename(filename))[1].lower()
+    return ext if ext[1:].isalnum() and len(ext) <= 10 else ""
+
+
+async def create_upload_url(user_id, challenge_id, filename: str) -> ProofUploadResponse:
+    """ URL de upload assinado (uso único) para um nome de objeto novo e imprevisível. """
+    path = f"{proof_prefix(user_id, challenge_id)}{uuid.uuid4().hex}{_extension(filename)}"
+    signed = await supabase.storage.from_(settings.PROOFS_BUCKET).create_signed_upload_url(path)
+    return ProofUploadResponse(
+        bucket=settings.PROOFS_BUCKET, path=signed["path"], signed_url=signed["signed_url"], token=signed["token"],
+    )
+
+
+def _storage_url(route: str) -> str:
+    return f"{supabase.url}/storage/v1/{route}"
+
+
+async def exists(path: str) -> bool:
+    """
+    HEAD ao objeto: confirma que o ficheiro foi mesmo enviado antes de o registar.
+    Só 404 quer dizer "não existe"; 403, 5xx, etc. levantam erro.
+    """
+    res = await supabase.http_client.head(
+        _storage_url(f"object/{settings.PROOFS_BUCKET}/{quote(path)}"), headers=supabase.service_headers())
+    if res.status_code == 404:
+        return False
+    res.raise_for_status()
+    return True
+
+
+async def signed_read_urls(paths: List[str]) -> Dict[str, Optional[str]]:
+    """
+    URLs de leitura temporários para vários ficheiros numa só chamada ao Storage.
+    Um ficheiro em falta (ou recusado) volta com signedURL null e fica None, sem
+    estragar os outros (o create_signed_urls do storage3 falha o lote inteiro).
+    """
+    unique = list(dict.fromkeys(paths))
+    res = await supabase.http_client.post(
+        _storage_url(f"object/sign/{settings.PROOFS_BUCKET}"),
+        json={"paths": unique, "expiresIn": settings.PROOF_READ_URL_TTL},
+        headers=supabase.service_headers(),
+    )
+    res.raise_for_status()
+    return {
+        item["path"]: _storage_url(item["signedURL"].lstrip("/")) if item.get("signedURL") and not item.get("error") else None
+        for item in res.json()
+    }
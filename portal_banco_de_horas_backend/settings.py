@@ -1,5 +1,6 @@
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 
 class Settings(BaseSettings):
     """
@@ -12,6 +13,77 @@ class Settings(BaseSettings):
     # Mapeia as variáveis que queremos ler
     SUPABASE_URL: str
     SUPABASE_KEY: str
+    # service_role key (só no servidor, nunca no frontend): obrigatória para a API de
+    # admin do Auth (importação de utilizadores) e para o Storage das provas
+    SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
+
+    # Pool de ligações HTTP ao Supabase
+    SUPABASE_MAX_CONNECTIONS: int = 200
+    SUPABASE_MAX_KEEPALIVE: int = 50
+    SUPABASE_TIMEOUT: float = 30.0
+
+    # Autenticação: "local" valida o JWT no próprio processo (segredo ou JWKS),
+    # "remote" pergunta ao servidor de Auth do Supabase a cada pedido.
+    # Sem AUTH_MODE: "local" só se SUPABASE_JWT_SECRET ou SUPABASE_JWKS_URL estiverem definidos
+    AUTH_MODE: Optional[str] = None
+    SUPABASE_JWT_SECRET: Optional[str] = None
+    SUPABASE_JWKS_URL: Optional[str] = None
+    JWT_AUDIENCE: str = "authenticated"
+    AUTH_CACHE_TTL: int = 60
+    AUTH_CACHE_SIZE: int = 1024
+    PROFILE_CACHE_TTL: int = 300
+    PROFILE_CACHE_SIZE: int = 512
+    RESPONSE_CACHE_TTL: int = 300
+
+    # Sincronização incremental: só entregar linhas com updated_at mais antigo do que
+    # N segundos (updated_at = início da transação; dá tempo às transações em curso)
+    SYNC_SAFETY_LAG: int = 30
+
+    # Listas do admin: linhas por página quando o pedido não traz 'limit' (máximo 500)
+    DEFAULT_PAGE_SIZE: int = 100
+
+    # Operações em lote (quantas chamadas ao banco em simultâneo)
+    BULK_CONCURRENCY: int = 10
+
+    # Serializa listas grandes tal como vêm do banco, sem validação Pydantic (nem o
+    # EmailStr dos perfis): só para bases de dados em que se confia
+    TRUST_DB_ROWS: bool = False
+
+    # Regista (log) os pedidos mais lentos do que isto, com o detalhe por fase
+    SLOW_REQUEST_MS: Optional[int] = None
+
+    # Eventos em tempo real para o admin (SSE); com REALTIME_ENABLED as alterações
+    # vêm do Supabase Realtime, senão das escritas feitas por esta API
+    REALTIME_ENABLED: bool = False
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT: float = 15.0
+    EVENTS_MAX_SUBSCRIBERS: int = 100
+    EVENTS_TICKET_TTL: int = 30
+    # Segredo (só do servidor) que assina os bilhetes do SSE; sem ele usa SUPABASE_JWT_SECRET
+    # e, na falta deste, um segredo aleatório por processo (obrigatório se houver vários workers)
+    EVENTS_TICKET_SECRET: Optional[str] = None
+
+    # Ranking em memória: releitura completa dos perfis a cada N segundos
+    LEADERBOARD_REFRESH: int = 300
+
+    # Índice de férias em memória (ausências/cobertura): releitura a cada N segundos
+    VACATION_INDEX_REFRESH: int = 300
+
+    # Idempotency-Key: quantas chaves guardar e durante quanto tempo (segundos)
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_TTL: int = 86400
+
+    # Importação de utilizadores: máximo de linhas por ficheiro e linhas por insert
+    IMPORT_MAX_ROWS: int = 5000
+    IMPORT_CHUNK_SIZE: int = 500
+
+    # Provas enviadas diretamente para o Supabase Storage (URLs assinados)
+    PROOFS_BUCKET: str = "proofs"
+    PROOF_READ_URL_TTL: int = 600
+
+    # Snapshots do ledger de saldos tirados pelo próprio processo a cada N segundos
+    # (None = desligado; usar o pg_cron de sql/ledger.sql ou POST /admin/ledger/snapshots)
+    LEDGER_SNAPSHOT_INTERVAL: Optional[int] = None
 
 # cria uma instância única das configurações para ser usada por toda a app
 settings = Settings()
\ No newline at end of file
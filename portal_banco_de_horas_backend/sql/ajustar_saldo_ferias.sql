@@ -0,0 +1,32 @@
+-- Ficheiro: sql/ajustar_saldo_ferias.sql
+-- Ajuste atómico do saldo de férias + registo no histórico, numa só chamada.
+-- Usado por POST /ferias/admin/ajustar-saldo (ferias.ajustar_saldo_admin).
+--
+-- O incremento é feito pelo próprio Postgres (insert ... on conflict do update
+-- days = days + delta), por isso dois ajustes em simultâneo nunca se sobrepõem.
+
+create or replace function public.ajustar_saldo_ferias(
+  p_user_id uuid,
+  p_dias integer,
+  p_nota text
+)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_novo_saldo integer;
+begin
+  insert into vacation_balances (user_id, days)
+  values (p_user_id, p_dias)
+  on conflict (user_id) do update
+    set days = vacation_balances.days + excluded.days
+  returning days into v_novo_saldo;
+
+  insert into vacation_history (user_id, start_date, end_date, notes)
+  values (p_user_id, current_date, current_date, p_nota);
+
+  return v_novo_saldo;
+end;
+$$;
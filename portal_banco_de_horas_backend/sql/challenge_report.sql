@@ -0,0 +1,94 @@
+-- Ficheiro: sql/challenge_report.sql
+-- Relatório de desafios agregado no próprio Postgres.
+-- Usado por GET /admin/challenges/report e GET /admin/challenges/{cid}/report.
+--
+-- Devolve uma linha por desafio (ou por cargo, no detalhe), por isso o tamanho
+-- da resposta depende do número de desafios e não do número de participações.
+
+-- O group by e o filtro por desafio leem só o índice
+create index if not exists participants_challenge_status_idx
+  on public.participants (challenge_id, status);
+
+create or replace function public.challenge_report(p_challenge_id uuid default null)
+returns table (
+  challenge_id uuid,
+  title text,
+  points integer,
+  due_at timestamptz,
+  created_at timestamptz,
+  total bigint,
+  inscrito bigint,
+  enviado bigint,
+  validado bigint,
+  recusado bigint,
+  points_awarded bigint,
+  completion_rate numeric
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select
+    c.id,
+    c.title,
+    c.points,
+    c.due_at,
+    c.created_at,
+    coalesce(s.total, 0),
+    coalesce(s.inscrito, 0),
+    coalesce(s.enviado, 0),
+    coalesce(s.validado, 0),
+    coalesce(s.recusado, 0),
+    coalesce(s.validado, 0) * c.points,
+    round(coalesce(s.validado, 0)::numeric / nullif(s.total, 0), 4)
+  from challenges c
+  left join (
+    select
+      p.challenge_id,
+      count(*) as total,
+      count(*) filter (where p.status = 'inscrito') as inscrito,
+      count(*) filter (where p.status = 'enviado') as enviado,
+      count(*) filter (where p.status = 'validado') as validado,
+      count(*) filter (where p.status = 'recusado') as recusado
+    from participants p
+    where p_challenge_id is null or p.challenge_id = p_challenge_id
+    group by p.challenge_id
+  ) s on s.challenge_id = c.id
+  where p_challenge_id is null or c.id = p_challenge_id
+  order by c.created_at desc;
+$$;
+
+-- Detalhe de um desafio: os mesmos contadores, por cargo de quem participa
+create or replace function public.challenge_report_by_role(p_challenge_id uuid)
+returns table (
+  role text,
+  total bigint,
+  inscrito bigint,
+  enviado bigint,
+  validado bigint,
+  recusado bigint,
+  points_awarded bigint,
+  completion_rate numeric
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select
+    pr.role,
+    count(*),
+    count(*) filter (where p.status = 'inscrito'),
+    count(*) filter (where p.status = 'enviado'),
+    count(*) filter (where p.status = 'validado'),
+    count(*) filter (where p.status = 'recusado'),
+    count(*) filter (where p.status = 'validado') * max(c.points),
+    round((count(*) filter (where p.status = 'validado'))::numeric / count(*), 4)
+  from participants p
+  join challenges c on c.id = p.challenge_id
+  join profiles pr on pr.id = p.user_id
+  where p.challenge_id = p_challenge_id
+  group by pr.role
+  order by pr.role;
+$$;
@@ -0,0 +1,171 @@
+-- Ficheiro: sql/ledger.sql
+-- Livro de movimentos (ledger) dos saldos de pontos e horas + snapshots periódicos.
+-- Usado pelas rotas /admin/ledger/... (ledger.py).
+--
+--   * balance_ledger: uma linha por alteração de profiles.points/hours, escrita por
+--     trigger, por isso apanha todas as RPCs (process_request, convert_points_to_hours,
+--     admin_add_hours, validate_participation) sem as alterar. Só se acrescenta.
+--   * balance_snapshots: saldo de cada utilizador com todos os movimentos anteriores
+--     a taken_at. O saldo numa data = último snapshot antes dela + os movimentos
+--     seguintes, em vez de somar o histórico todo.
+--
+-- As RPCs podem identificar-se com set_config('app.ledger_source', '<nome>', true);
+-- sem isso o movimento fica com a origem 'profiles'.
+--
+-- Acesso: só a service_role (ledger.py, depois da verificação de admin) lê as tabelas
+-- e corre as funções; anon/authenticated não têm nenhum privilégio (ver o fim do ficheiro).
+-- Ninguém tem update/delete no ledger: só o trigger (security definer) acrescenta linhas.
+
+create table if not exists public.balance_ledger (
+  id bigint generated always as identity primary key,
+  user_id uuid not null,
+  occurred_at timestamptz not null default now(),
+  points_delta integer not null default 0,
+  hours_delta integer not null default 0,
+  source text not null default 'profiles'
+);
+create index if not exists balance_ledger_user_occurred_idx
+  on public.balance_ledger (user_id, occurred_at, id);
+
+create table if not exists public.balance_snapshots (
+  user_id uuid not null,
+  taken_at timestamptz not null,
+  points bigint not null,
+  hours bigint not null,
+  primary key (user_id, taken_at)
+);
+
+create or replace function public.record_balance_change()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_points integer := coalesce(new.points, 0) - case when tg_op = 'INSERT' then 0 else coalesce(old.points, 0) end;
+  v_hours integer := coalesce(new.hours, 0) - case when tg_op = 'INSERT' then 0 else coalesce(old.hours, 0) end;
+begin
+  if v_points <> 0 or v_hours <> 0 then
+    insert into balance_ledger (user_id, points_delta, hours_delta, source)
+    values (new.id, v_points, v_hours, coalesce(nullif(current_setting('app.ledger_source', true), ''), 'profiles'));
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists profiles_record_balance on public.profiles;
+create trigger profiles_record_balance
+  after insert or update of points, hours on public.profiles
+  for each row execute function public.record_balance_change();
+
+-- Abertura: o saldo atual de quem ainda não tem movimentos (corre uma vez, é idempotente)
+insert into public.balance_ledger (user_id, points_delta, hours_delta, source)
+select p.id, coalesce(p.points, 0), coalesce(p.hours, 0), 'abertura'
+from public.profiles p
+where not exists (select 1 from public.balance_ledger l where l.user_id = p.id);
+
+-- Saldo de um utilizador num instante: um snapshot + a cauda de movimentos
+create or replace function public.balance_as_of(p_user_id uuid, p_at timestamptz default now())
+returns table (points bigint, hours bigint, snapshot_at timestamptz, tail_events integer)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  with snap as (
+    select s.taken_at, s.points, s.hours
+    from balance_snapshots s
+    where s.user_id = p_user_id and s.taken_at <= p_at
+    order by s.taken_at desc
+    limit 1
+  )
+  select
+    coalesce((select snap.points from snap), 0) + coalesce(sum(l.points_delta), 0),
+    coalesce((select snap.hours from snap), 0) + coalesce(sum(l.hours_delta), 0),
+    (select snap.taken_at from snap),
+    count(l.id)::integer
+  from balance_ledger l
+  where l.user_id = p_user_id
+    and l.occurred_at <= p_at
+    and l.occurred_at >= coalesce((select snap.taken_at from snap), '-infinity');
+$$;
+
+-- Snapshot de todos os utilizadores com movimentos desde o último (periódico: pg_cron ou ledger.py).
+-- O corte fica p_lag atrás do relógio: uma transação ainda aberta (occurred_at = início
+-- da transação) nunca escreve um movimento para antes de um snapshot já tirado.
+create or replace function public.take_balance_snapshots(p_lag interval default interval '5 minutes')
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with last_snap as (
+    select distinct on (s.user_id) s.user_id, s.taken_at, s.points, s.hours
+    from balance_snapshots s
+    order by s.user_id, s.taken_at desc
+  ),
+  tail as (
+    select l.user_id, sum(l.points_delta) as points, sum(l.hours_delta) as hours
+    from balance_ledger l
+    left join last_snap ls on ls.user_id = l.user_id
+    where l.occurred_at >= coalesce(ls.taken_at, '-infinity')
+      and l.occurred_at < now() - p_lag
+    group by l.user_id
+  ),
+  inserted as (
+    insert into balance_snapshots (user_id, taken_at, points, hours)
+    select t.user_id, now() - p_lag, coalesce(ls.points, 0) + t.points, coalesce(ls.hours, 0) + t.hours
+    from tail t
+    left join last_snap ls on ls.user_id = t.user_id
+    on conflict (user_id, taken_at) do nothing
+    returning 1
+  )
+  select count(*)::integer from inserted;
+$$;
+
+-- Reconciliação: utilizadores cujo contador em profiles difere do que o ledger diz
+create or replace function public.reconcile_balances()
+returns table (user_id uuid, points bigint, hours bigint, ledger_points bigint, ledger_hours bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  with last_snap as (
+    select distinct on (s.user_id) s.user_id, s.taken_at, s.points, s.hours
+    from balance_snapshots s
+    order by s.user_id, s.taken_at desc
+  ),
+  ledger as (
+    select p.id as user_id,
+           coalesce(ls.points, 0) + coalesce(sum(l.points_delta), 0) as points,
+           coalesce(ls.hours, 0) + coalesce(sum(l.hours_delta), 0) as hours
+    from profiles p
+    left join last_snap ls on ls.user_id = p.id
+    left join balance_ledger l on l.user_id = p.id and l.occurred_at >= coalesce(ls.taken_at, '-infinity')
+    group by p.id, ls.points, ls.hours
+  )
+  select p.id, coalesce(p.points, 0)::bigint, coalesce(p.hours, 0)::bigint, g.points, g.hours
+  from profiles p
+  join ledger g on g.user_id = p.id
+  where coalesce(p.points, 0) <> g.points or coalesce(p.hours, 0) <> g.hours
+  order by p.id;
+$$;
+
+-- Fechar à chave pública: RLS sem políticas + nenhum privilégio para anon/authenticated.
+-- A service_role só lê; escrevem apenas o trigger e take_balance_snapshots (security definer).
+alter table public.balance_ledger enable row level security;
+alter table public.balance_snapshots enable row level security;
+revoke all on table public.balance_ledger, public.balance_snapshots from public, anon, authenticated, service_role;
+grant select on table public.balance_ledger, public.balance_snapshots to service_role;
+
+revoke all on function public.record_balance_change() from public, anon, authenticated;
+revoke all on function public.balance_as_of(uuid, timestamptz) from public, anon, authenticated;
+revoke all on function public.take_balance_snapshots(interval) from public, anon, authenticated;
+revoke all on function public.reconcile_balances() from public, anon, authenticated;
+grant execute on function public.balance_as_of(uuid, timestamptz) to service_role;
+grant execute on function public.take_balance_snapshots(interval) to service_role;
+grant execute on function public.reconcile_balances() to service_role;
+
+-- Opcional (com a extensão pg_cron): snapshot diário às 03:00
+-- select cron.schedule('balance-snapshots', '0 3 * * *', 'select public.take_balance_snapshots()');
@@ -0,0 +1,22 @@
+-- Ficheiro: sql/participants_unique.sql
+-- Uma só participação por utilizador e desafio.
+-- Usado por POST /me/challenges/{cid}/enroll (main.enroll_in_challenge), que faz
+-- upsert com on_conflict=user_id,challenge_id e ignore_duplicates numa só chamada:
+-- duplos cliques ou pedidos em simultâneo nunca criam linhas repetidas.
+
+-- Limpa duplicados antigos, ficando a participação mais avançada (ou a mais antiga)
+delete from public.participants p
+using public.participants q
+where p.user_id = q.user_id
+  and p.challenge_id = q.challenge_id
+  and p.id <> q.id
+  and (
+    array_position(array['inscrito', 'enviado', 'recusado', 'validado'], p.status::text)
+      < array_position(array['inscrito', 'enviado', 'recusado', 'validado'], q.status::text)
+    or (p.status = q.status and (p.created_at, p.id) > (q.created_at, q.id))
+  );
+
+alter table public.participants
+  drop constraint if exists participants_user_challenge_key;
+alter table public.participants
+  add constraint participants_user_challenge_key unique (user_id, challenge_id);
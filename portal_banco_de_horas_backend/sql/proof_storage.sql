@@ -0,0 +1,20 @@
+-- Ficheiro: sql/proof_storage.sql
+-- Provas dos desafios guardadas no Supabase Storage (proof_storage.py).
+--
+-- O browser envia o ficheiro diretamente para o bucket com um URL de upload
+-- assinado pedido em POST /me/challenges/{cid}/proof/upload-url; a API só grava
+-- o caminho (participants.proof_path). O bucket é privado: o admin vê as provas
+-- por URLs de leitura temporários (POST /admin/proofs/signed-urls).
+--
+-- A API fala com o Storage com a service_role key (SUPABASE_SERVICE_ROLE_KEY), que
+-- ignora o RLS de storage.objects. Por isso NÃO há políticas para anon/authenticated:
+-- com a chave pública ninguém lê nem escreve neste bucket; o browser só usa os URLs
+-- assinados (com token) que a API emite, presos a "{user_id}/{challenge_id}/...".
+
+alter table public.participants
+  add column if not exists proof_path text;
+
+-- Limite de tamanho e tipos aceites aplicados pelo próprio Storage no upload
+insert into storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+values ('proofs', 'proofs', false, 10485760, array['image/*', 'application/pdf'])
+on conflict (id) do nothing;
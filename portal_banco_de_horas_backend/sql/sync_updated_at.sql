@@ -0,0 +1,85 @@
+-- Ficheiro: sql/sync_updated_at.sql
+-- Suporte às rotas de sincronização incremental (GET /admin/sync/...):
+--   * coluna updated_at mantida por trigger em requests, participants e profiles;
+--   * tabela deleted_rows com as "lápides" das linhas apagadas;
+--   * trigger em vacation_balances que avança o updated_at do perfil.
+-- As rotas paginam por (updated_at, id): o "default now()" abaixo dá o mesmo
+-- updated_at a todas as linhas já existentes, e o id desempata.
+
+create table if not exists public.deleted_rows (
+  table_name text not null,
+  row_id uuid not null,
+  deleted_at timestamptz not null default now()
+);
+-- A sincronização pagina por (deleted_at, row_id)
+drop index if exists public.deleted_rows_table_deleted_at_idx;
+create index if not exists deleted_rows_table_deleted_at_row_idx
+  on public.deleted_rows (table_name, deleted_at, row_id);
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+create or replace function public.record_deleted_row()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  insert into deleted_rows (table_name, row_id) values (tg_table_name, old.id);
+  return old;
+end;
+$$;
+
+do $$
+declare
+  t text;
+begin
+  foreach t in array array['requests', 'participants', 'profiles'] loop
+    execute format('alter table public.%I add column if not exists updated_at timestamptz not null default now()', t);
+    execute format('create index if not exists %I on public.%I (updated_at, id)', t || '_updated_at_idx', t);
+    execute format('drop trigger if exists %I on public.%I', t || '_set_updated_at', t);
+    execute format('create trigger %I before update on public.%I for each row execute function public.set_updated_at()',
+                   t || '_set_updated_at', t);
+    execute format('drop trigger if exists %I on public.%I', t || '_record_deleted', t);
+    execute format('create trigger %I after delete on public.%I for each row execute function public.record_deleted_row()',
+                   t || '_record_deleted', t);
+  end loop;
+end;
+$$;
+
+-- O saldo de férias segue no perfil (GET /admin/sync/users): uma alteração em
+-- vacation_balances avança o updated_at do perfil dono para a sincronização a apanhar
+create or replace function public.touch_profile_from_balance()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  update profiles set updated_at = now()
+  where id = case when tg_op = 'DELETE' then old.user_id else new.user_id end;
+  return null;
+end;
+$$;
+
+drop trigger if exists vacation_balances_touch_profile on public.vacation_balances;
+create trigger vacation_balances_touch_profile
+  after insert or update of days or delete on public.vacation_balances
+  for each row execute function public.touch_profile_from_balance();
+revoke all on function public.touch_profile_from_balance() from public, anon, authenticated;
+
+-- Lápides fechadas à chave pública (ninguém insere lápides falsas nem apaga as dos
+-- outros): RLS sem políticas; só a service_role lê (sync.py) e só o trigger escreve.
+alter table public.deleted_rows enable row level security;
+revoke all on table public.deleted_rows from public, anon, authenticated, service_role;
+grant select on table public.deleted_rows to service_role;
+revoke all on function public.record_deleted_row() from public, anon, authenticated;
+revoke all on function public.set_updated_at() from public, anon, authenticated;
@@ -0,0 +1,27 @@
+-- Ficheiro: sql/vacation_history_ranges.sql
+-- Índice de intervalos no próprio banco para vacation_history.
+--
+-- A API já recusa sobreposições (índice em memória, ferias.py), mas vários processos
+-- podem registar em simultâneo: a restrição de exclusão é a garantia final e a
+-- rota devolve 409 na mesma. As linhas "AJUSTE MANUAL" (ajuste de saldo) não são
+-- ausências e ficam fora da restrição.
+
+create extension if not exists btree_gist;
+
+-- Consultas "quem está ausente entre A e B" feitas diretamente no banco
+create index if not exists vacation_history_periodo_idx
+  on public.vacation_history using gist (daterange(start_date, end_date, '[]'));
+
+-- Antes de criar a restrição, corrigir (ou apagar) as sobreposições que já existam:
+--   select a.id, b.id, a.user_id
+--   from vacation_history a
+--   join vacation_history b on a.user_id = b.user_id and a.id < b.id
+--    and daterange(a.start_date, a.end_date, '[]') && daterange(b.start_date, b.end_date, '[]')
+--   where coalesce(a.notes, '') not like 'AJUSTE MANUAL%' and coalesce(b.notes, '') not like 'AJUSTE MANUAL%';
+
+alter table public.vacation_history
+  drop constraint if exists vacation_history_sem_sobreposicao;
+alter table public.vacation_history
+  add constraint vacation_history_sem_sobreposicao
+  exclude using gist (user_id with =, daterange(start_date, end_date, '[]') with &&)
+  where (coalesce(notes, '') not like 'AJUSTE MANUAL%');
@@ -1,15 +1,201 @@
 # Ficheiro: supabase_client.py
+# (Cliente assíncrono leve: PostgREST + Auth, criados só quando são precisos.
+#  Storage e Realtime só são importados se alguma rota os usar.)
 
-from supabase import create_client, Client
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from supabase_auth import AsyncGoTrueClient
 from settings import settings # <-- CORRIGIDO (sem o ponto)
+from metrics import InstrumentedQuery
+
+
+class SupabaseClients:
+    """
+    O mesmo que o cliente do pacote `supabase` usa por baixo (PostgREST, Auth,
+    Storage, Realtime), partilhando um único pool de ligações HTTP, mas sem
+    importar/criar os serviços que a API não usa no arranque.
+    """
+
+    def __init__(self, url: str, key: str, http_client: httpx.AsyncClient, service_key: Optional[str] = None):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.service_key = service_key
+        self.http_client = http_client
+        self.headers = {"apiKey": key, "Authorization": f"Bearer {key}"}
+        self.postgrest = AsyncPostgrestClient(f"{self.url}/rest/v1", headers=self.headers, http_client=http_client)
+        # Sessão nunca guardada: o cliente é partilhado por todos os pedidos
+        self.auth = AsyncGoTrueClient(
+            url=f"{self.url}/auth/v1",
+            headers=self.headers,
+            http_client=http_client,
+            auto_refresh_token=False,
+            persist_session=False,
+        )
+        self._service_auth = None
+        self._service_postgrest = None
+        self._storage = None
+        self._realtime = None
+
+    def table(self, name: str):
+        return self.postgrest.from_(name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return self.postgrest.rpc(fn, params or {}, *args, **kwargs)
+
+    def service_headers(self) -> dict:
+        if not self.service_key:
+            raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY não configurada.")
+        return {"apiKey": self.service_key, "Authorization": f"Bearer {self.service_key}"}
+
+    @property
+    def service_postgrest(self) -> AsyncPostgrestClient:
+        """ PostgREST com a service_role key: tabelas/RPCs fechadas à chave pública (RLS + revoke). """
+        if self._service_postgrest is None:
+            self._service_postgrest = AsyncPostgrestClient(
+                f"{self.url}/rest/v1", headers=self.service_headers(), http_client=self.http_client)
+        return self._service_postgrest
+
+    def service_table(self, name: str):
+        return self.service_postgrest.from_(name)
+
+    def service_rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return self.service_postgrest.rpc(fn, params or {}, *args, **kwargs)
+
+    @property
+    def service_auth(self):
+        """ Auth com a service_role key: só para a API de admin (auth.admin.create_user/list_users). """
+        if self._service_auth is None:
+            self._service_auth = AsyncGoTrueClient(
+                url=f"{self.url}/auth/v1",
+                headers=self.service_headers(),
+                http_client=self.http_client,
+                auto_refresh_token=False,
+                persist_session=False,
+            )
+        return self._service_auth
+
+    @property
+    def storage(self):
+        """ Storage com a service_role key: o bucket das provas é privado e sem políticas para anon. """
+        if self._storage is None:
+            from storage3 import AsyncStorageClient
+            self._storage = AsyncStorageClient(f"{self.url}/storage/v1/", self.service_headers(), http_client=self.http_client)
+        return self._storage
+
+    @property
+    def realtime(self):
+        if self._realtime is None:
+            from realtime import AsyncRealtimeClient
+            ws_url = f"{self.url}/realtime/v1".replace("http", "ws", 1)
+            self._realtime = AsyncRealtimeClient(ws_url, token=self.key)
+        return self._realtime
+
+
+class _SupabaseProxy:
+    """
+    Permite fazer `from supabase_client import supabase` em qualquer módulo.
+    O cliente é criado no lifespan (connect) ou, se ainda não existir,
+    no primeiro acesso.
+    """
+    _client: Optional[SupabaseClients] = None
+
+    def __getattr__(self, name):
+        return getattr(_ensure_client(), name)
+
+    # Queries e RPCs passam pelo wrapper de métricas (latência, linhas, erros)
+    def table(self, name: str):
+        return InstrumentedQuery(_ensure_client().table(name), "table", name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return InstrumentedQuery(_ensure_client().rpc(fn, params, *args, **kwargs), "rpc", fn)
 
-# Inicializa a ligação com o Supabase usando as chaves do settings.py
-try:
-    supabase: Client = create_client(
-        settings.SUPABASE_URL, 
-        settings.SUPABASE_KEY
+    def service_table(self, name: str):
+        return InstrumentedQuery(_ensure_client().service_table(name), "table", name)
+
+    def service_rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return InstrumentedQuery(_ensure_client().service_rpc(fn, params, *args, **kwargs), "rpc", fn)
+
+
+supabase = _SupabaseProxy()
+
+# Pool de ligações HTTP partilhado por PostgREST, Auth e Storage
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Resultado do último arranque/verificação (usado pelo /readyz)
+status = {"ready": False, "error": None, "checked_at": None}
+
+
+def _ensure_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> SupabaseClients:
+    global _http_client
+    if supabase._client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE,
+            ),
+            timeout=settings.SUPABASE_TIMEOUT,
+            transport=transport,
+        )
+        supabase._client = SupabaseClients(
+            settings.SUPABASE_URL, settings.SUPABASE_KEY, _http_client, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase._client
+
+
+async def check(timeout: float = 2.0) -> dict:
+    """
+    Confirma que o PostgREST e o Auth respondem (query mínima + /auth/v1/health).
+    Atualiza `status` e devolve o detalhe de cada verificação.
+    """
+    client = _ensure_client()
+    checks = {}
+
+    async def rest():
+        await client.postgrest.from_("settings").select("id").limit(1).execute()
+
+    async def auth():
+        r = await client.http_client.get(f"{client.url}/auth/v1/health", headers=client.headers)
+        r.raise_for_status()
+
+    for name, probe in (("postgrest", rest), ("auth", auth)):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout)
+            checks[name] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+        except Exception as e:
+            checks[name] = {"ok": False, "error": str(e) or type(e).__name__}
+
+    status["ready"] = all(c["ok"] for c in checks.values())
+    status["error"] = None if status["ready"] else "; ".join(
+        f"{n}: {c['error']}" for n, c in checks.items() if not c["ok"]
     )
-    print("Ligação ao Supabase estabelecida com sucesso!")
-except Exception as e:
-    print(f"Erro a ligar ao Supabase: {e}")
-    supabase = None
\ No newline at end of file
+    status["checked_at"] = time.time()
+    return checks
+
+
+async def connect(transport: Optional[httpx.AsyncBaseTransport] = None, warm_up: bool = True) -> None:
+    """
+    Cria o pool de ligações e os clientes e faz um aquecimento (abre as ligações
+    e confirma que o Supabase responde). Uma falha não impede o arranque:
+    fica registada e o /readyz responde 503 até o Supabase estar acessível.
+    """
+    _ensure_client(transport)
+    if warm_up:
+        await check()
+        if status["ready"]:
+            print("Ligação ao Supabase estabelecida com sucesso!")
+        else:
+            print(f"Erro a ligar ao Supabase: {status['error']}")
+
+
+async def disconnect() -> None:
+    """ Fecha o pool de ligações (chamado no encerramento da app). """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    supabase._client = None
+    status["ready"] = False
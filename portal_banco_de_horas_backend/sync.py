@@ -0,0 +1,126 @@
+# Ficheiro: sync.py
+# Sincronização incremental para os ecrãs do admin: em vez de voltar a descarregar
+# as listas inteiras, o cliente envia o último 'cursor' recebido e só recebe
+# as linhas inseridas/alteradas e as apagadas (lápides) desde então.
+# O cliente deve reenviar o 'cursor' devolvido (posição keyset); updated_since
+# continua aceite para começar a partir de um instante.
+# Requer sql/sync_updated_at.sql (coluna updated_at + tabela deleted_rows) e, para ler
+# as lápides, SUPABASE_SERVICE_ROLE_KEY (deleted_rows está fechada à chave pública).
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import TypeAdapter
+
+import auth
+from models import AdminRequestDetails, AdminParticipantDetails, AdminUserListResponse, SyncResponse
+from pagination import after, decode_cursor, encode_cursor
+from settings import settings
+from supabase_client import supabase
+
+router = APIRouter(prefix="/admin/sync", tags=["Admin"], dependencies=[Depends(auth.get_current_admin_user)])
+
+SYNC_PAGE_SIZE = 1000
+
+# Posição do cliente nas duas listas: última linha (updated_at, id) e última lápide (deleted_at, row_id)
+SYNC_CURSOR = ('updated_at', 'id', 'deleted_at', 'row_id')
+
+
+def _from(query, columns, position):
+    """ Linhas depois de `position`; sem id (início por updated_since) usa só o instante, com >=. """
+    ts, key = position
+    if ts is None:
+        return query
+    if key is None:
+        return query.gte(columns[0], ts)
+    return after(query, columns, position)
+
+
+async def _delta(table: str, select: str, updated_since: Optional[datetime], cursor: Optional[str], limit: int):
+    """
+    Linhas alteradas e lápides por ordem (updated_at, id) / (deleted_at, row_id), a partir
+    da posição do cursor. A chave composta faz a página avançar mesmo com milhares de
+    linhas com o mesmo updated_at (ex.: logo após sql/sync_updated_at.sql).
+    Só se entrega o que é mais antigo do que agora - SYNC_SAFETY_LAG: updated_at é o início
+    da transação e uma transação ainda aberta não pode ficar para trás do cursor.
+    """
+    horizon = (datetime.now(timezone.utc) - timedelta(seconds=settings.SYNC_SAFETY_LAG)).isoformat()
+    if cursor:
+        values = decode_cursor(cursor, SYNC_CURSOR)
+        rows_pos, dead_pos = tuple(values[:2]), tuple(values[2:])
+    elif updated_since:
+        since = updated_since.isoformat()
+        rows_pos, dead_pos = (since, None), (since, None)
+    else:
+        # Primeira sincronização: a lista completa; lápides só a partir de agora
+        rows_pos, dead_pos = (None, None), (horizon, None)
+
+    rows_q = supabase.table(table).select(select).lt('updated_at', horizon) \
+        .order('updated_at').order('id').limit(limit + 1)
+    dead_q = supabase.service_table('deleted_rows').select('row_id, deleted_at').eq('table_name', table) \
+        .lt('deleted_at', horizon).order('deleted_at').order('row_id').limit(limit + 1)
+    rows_res, dead_res = await asyncio.gather(
+        _from(rows_q, SYNC_CURSOR[:2], rows_pos).execute(),
+        _from(dead_q, SYNC_CURSOR[2:], dead_pos).execute(),
+    )
+    rows, dead = rows_res.data, dead_res.data
+
+    # Cada lista avança por si; o watermark (informativo) é até onde ambas estão completas
+    bounds = []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        bounds.append(rows[-1]['updated_at'])
+    if len(dead) > limit:
+        dead = dead[:limit]
+        bounds.append(dead[-1]['deleted_at'])
+    if rows:
+        rows_pos = (rows[-1]['updated_at'], rows[-1]['id'])
+    if dead:
+        dead_pos = (dead[-1]['deleted_at'], dead[-1]['row_id'])
+
+    next_cursor = encode_cursor(dict(zip(SYNC_CURSOR, rows_pos + dead_pos)), SYNC_CURSOR)
+    watermark = min(bounds) if bounds else horizon
+    return rows, [d['row_id'] for d in dead], watermark, next_cursor, bool(bounds)
+
+
+@router.get("/requests", response_model=SyncResponse[AdminRequestDetails])
+async def sync_requests(
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_PAGE_SIZE),
+):
+    rows, deleted, watermark, next_cursor, has_more = await _delta(
+        'requests', '*, profiles!requests_user_id_fkey(*)', updated_since, cursor, limit)
+    return SyncResponse[AdminRequestDetails](changed=rows, deleted=deleted, watermark=watermark, cursor=next_cursor, has_more=has_more)
+
+
+@router.get("/participants", response_model=SyncResponse[AdminParticipantDetails])
+async def sync_participants(
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_PAGE_SIZE),
+):
+    """ Todas as participações alteradas; a fila de pendentes é o subconjunto com status 'enviado'. """
+    rows, deleted, watermark, next_cursor, has_more = await _delta(
+        'participants',
+        '*, profiles!participants_user_id_fkey(*), challenges!participants_challenge_id_fkey(*)',
+        updated_since, cursor, limit)
+    return SyncResponse[AdminParticipantDetails](changed=rows, deleted=deleted, watermark=watermark, cursor=next_cursor, has_more=has_more)
+
+
+@router.get("/users", response_model=SyncResponse[AdminUserListResponse])
+async def sync_users(
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_PAGE_SIZE),
+):
+    """ Perfis alterados, com o saldo de férias (uma alteração do saldo avança o updated_at do perfil). """
+    rows, deleted, watermark, next_cursor, has_more = await _delta('profiles', '*, vacation_balances(days)', updated_since, cursor, limit)
+    for row in rows:
+        balance = row.pop('vacation_balances', None)
+        if isinstance(balance, list):
+            balance = balance[0] if balance else None
+        row['vacation_days'] = (balance or {}).get('days', 0)
+    return SyncResponse[AdminUserListResponse](changed=rows, deleted=deleted, watermark=watermark, cursor=next_cursor, has_more=has_more)
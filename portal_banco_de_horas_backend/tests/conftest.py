@@ -0,0 +1,68 @@
+# Ficheiro: tests/conftest.py
+# O settings lê estas variáveis antes do .env: os testes nunca falam com o projeto real.
+# Fixtures: `fake` (Supabase simulado de benchmarks/fake_supabase.py, com poucos dados)
+# e `api` (corre uma função com um cliente httpx ligado à app e ao `fake`).
+
+import asyncio
+import os
+import sys
+import time
+
+TEST_SECRET = "test-secret-test-secret-test-secret-0123"
+TEST_SERVICE_KEY = "test-service-key"
+os.environ.update({
+    "SUPABASE_URL": "http://supabase.test.local",
+    "SUPABASE_KEY": "test-key",
+    "SUPABASE_SERVICE_ROLE_KEY": TEST_SERVICE_KEY,
+    "SUPABASE_JWT_SECRET": TEST_SECRET,
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+import pytest  # noqa: E402
+
+from benchmarks.fake_supabase import FakeSupabase, seed  # noqa: E402
+
+
+def bearer(profile: dict, ttl: int = 3600) -> dict:
+    """ Cabeçalho Authorization com um JWT criado localmente para este perfil. """
+    now = int(time.time())
+    claims = {"sub": profile["id"], "email": profile["email"], "aud": "authenticated",
+              "role": "authenticated", "iat": now, "exp": now + ttl}
+    return {"Authorization": f"Bearer {jwt.encode(claims, TEST_SECRET, algorithm='HS256')}"}
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """ Supabase simulado com 5 perfis (o primeiro é admin) e 2 desafios; `fake.profiles`. """
+    import cache
+    import ferias
+    import leaderboard
+    # Estado em memória dos módulos: cada teste começa do zero
+    for c in cache.caches.values():
+        c.clear()
+    monkeypatch.setattr(leaderboard, "_loaded_at", None)
+    monkeypatch.setattr(ferias, "_indice", None)
+
+    fake = FakeSupabase(service_key=TEST_SERVICE_KEY)
+    fake.profiles = seed(fake, users=5, requests=0, participants=0, challenges=2, vacations=0)
+    return fake
+
+
+@pytest.fixture
+def api(fake):
+    """ api(fn): corre `await fn(client)` com a app ligada ao `fake` e devolve o resultado. """
+    def run(fn):
+        async def main():
+            import main as app_module
+            import supabase_client
+            await supabase_client.connect(transport=fake.transport(), warm_up=False)
+            try:
+                transport = httpx.ASGITransport(app=app_module.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://api.test") as client:
+                    return await fn(client)
+            finally:
+                await supabase_client.disconnect()
+        return asyncio.run(main())
+    return run
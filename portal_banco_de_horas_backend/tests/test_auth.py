@@ -0,0 +1,123 @@
+# Ficheiro: tests/test_auth.py
+# Validação dos tokens (auth.get_current_user) com JWTs criados localmente.
+
+import asyncio
+import time
+import uuid
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+import auth
+from settings import settings
+from tests.conftest import TEST_SECRET
+
+USER_ID = str(uuid.uuid4())
+
+
+def mint(ttl: int = 3600, aud: str = "authenticated", secret: str = TEST_SECRET, **extra) -> str:
+    now = int(time.time())
+    claims = {"sub": USER_ID, "email": "a@exemplo.pt", "aud": aud, "role": "authenticated",
+              "iat": now, "exp": now + ttl, **extra}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def current_user(token: str):
+    return asyncio.run(auth.get_current_user(f"Bearer {token}"))
+
+
+class FakeAuth:
+    """ Substitui supabase.auth.get_user (modo remote) e conta as chamadas. """
+
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+
+    async def get_user(self, token):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return type("UserResponse", (), {"user": auth._user_from_claims(jwt.decode(
+            token, options={"verify_signature": False}))})()
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    fake = FakeAuth()
+    monkeypatch.setattr(auth, "supabase", type("Client", (), {"auth": fake})())
+    return fake
+
+
+@pytest.fixture
+def local(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", None)
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", TEST_SECRET)
+    auth._token_cache.clear()
+    yield
+    auth._token_cache.clear()
+
+
+def test_valid_token(local):
+    user = current_user(mint())
+    assert str(user.id) == USER_ID
+    assert user.email == "a@exemplo.pt"
+
+
+@pytest.mark.parametrize("token", [
+    mint(ttl=-60),
+    mint(aud="outra-audiencia"),
+    mint(secret="outro-segredo-outro-segredo-outro-0123"),
+    "isto-nao-e-um-jwt",
+])
+def test_invalid_tokens_are_401(local, token):
+    with pytest.raises(HTTPException) as e:
+        current_user(token)
+    assert e.value.status_code == 401
+
+
+def test_missing_bearer_is_401(local):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(auth.get_current_user(None))
+    assert e.value.status_code == 401
+
+
+def test_verified_token_is_cached(local, monkeypatch):
+    calls = []
+    decode = auth._decode_local
+    monkeypatch.setattr(auth, "_decode_local", lambda t: calls.append(t) or decode(t))
+    token = mint()
+    assert current_user(token).id == current_user(token).id
+    assert len(calls) == 1
+
+
+def test_default_without_signing_key_is_remote(monkeypatch, remote):
+    monkeypatch.setattr(settings, "AUTH_MODE", None)
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+    monkeypatch.setattr(settings, "SUPABASE_JWKS_URL", None)
+    assert auth.auth_mode() == "remote"
+    assert str(current_user(mint()).id) == USER_ID
+    assert remote.calls == 1
+
+
+def test_remote_mode_rejects_with_401(monkeypatch):
+    from supabase_auth.errors import AuthApiError
+    monkeypatch.setattr(settings, "AUTH_MODE", "remote")
+    monkeypatch.setattr(auth, "supabase", type("Client", (), {
+        "auth": FakeAuth(error=AuthApiError("invalid JWT", 401, "bad_jwt"))})())
+    with pytest.raises(HTTPException) as e:
+        current_user(mint())
+    assert e.value.status_code == 401
+
+
+def test_jwks_without_key_falls_back_to_remote(monkeypatch, remote):
+    class NoKeys:
+        def get_signing_key_from_jwt(self, token):
+            raise jwt.PyJWKClientError("Unable to find a signing key that matches")
+
+    monkeypatch.setattr(settings, "AUTH_MODE", "local")
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+    monkeypatch.setattr(auth, "_get_jwks_client", lambda: NoKeys())
+    auth._token_cache.clear()
+    assert str(current_user(mint()).id) == USER_ID
+    assert remote.calls == 1
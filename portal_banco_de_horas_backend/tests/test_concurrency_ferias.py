@@ -0,0 +1,30 @@
+# Ficheiro: tests/test_concurrency_ferias.py
+# Concorrência do ajuste de saldo de férias: N ajustes em paralelo para o mesmo
+# utilizador têm de somar todos ao saldo final, com uma linha de histórico cada.
+
+import asyncio
+import random
+
+from tests.conftest import bearer
+
+
+def test_parallel_adjustments_are_not_lost(api, fake):
+    admin, target = fake.profiles[0], fake.profiles[1]
+    # Latência com variação para os pedidos se intercalarem no Supabase simulado
+    fake.latency, fake.jitter = 0.005, 0.0025
+    initial = next(b["days"] for b in fake.tables["vacation_balances"] if b["user_id"] == target["id"])
+    rnd = random.Random(7)
+    deltas = [rnd.choice([-2, -1, 1, 2, 3, 5]) for _ in range(50)]
+
+    async def scenario(client):
+        responses = await asyncio.gather(*(
+            client.post("/ferias/admin/ajustar-saldo", json={"user_id": target["id"], "dias": d}, headers=bearer(admin))
+            for d in deltas
+        ))
+        final = await client.get(f"/ferias/meu-saldo/{target['id']}", headers=bearer(admin))
+        return responses, final
+
+    responses, final = api(scenario)
+    assert [r.status_code for r in responses] == [200] * len(deltas)
+    assert final.json()["dias"] == initial + sum(deltas)
+    assert sum(1 for h in fake.tables["vacation_history"] if h["user_id"] == target["id"]) == len(deltas)
@@ -0,0 +1,38 @@
+# Ficheiro: tests/test_pagination.py
+# Listas do admin paginadas por cursor (pagination.py), com e sem 'limit'.
+
+import pagination
+from tests.conftest import bearer
+
+
+def test_lists_are_paged_by_default_and_follow_the_cursor(api, fake, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 2)
+    admin = fake.profiles[0]
+
+    async def scenario(client):
+        pages, cursor = [], None
+        while True:
+            params = {"cursor": cursor} if cursor else {}
+            res = await client.get("/admin/users", params=params, headers=bearer(admin))
+            assert res.status_code == 200
+            pages.append([u["id"] for u in res.json()])
+            cursor = res.headers.get(pagination.NEXT_CURSOR_HEADER)
+            if not cursor:
+                return pages
+
+    pages = api(scenario)
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert sorted(i for p in pages for i in p) == sorted(p["id"] for p in fake.profiles)
+
+
+def test_limit_is_capped(api, fake):
+    admin = fake.profiles[0]
+
+    async def scenario(client):
+        over = await client.get("/admin/users", params={"limit": pagination.MAX_PAGE_SIZE + 1}, headers=bearer(admin))
+        small = await client.get("/admin/users", params={"limit": 3}, headers=bearer(admin))
+        return over, small
+
+    over, small = api(scenario)
+    assert over.status_code == 422
+    assert len(small.json()) == 3 and pagination.NEXT_CURSOR_HEADER in small.headers
@@ -0,0 +1,78 @@
+# Ficheiro: tests/test_proof_storage.py
+# Provas enviadas para o Storage (proof_storage.py) contra o Storage simulado.
+
+import httpx
+import pytest
+
+from tests.conftest import bearer
+
+
+def test_upload_url_requires_enrollment_and_uses_user_prefix(api, fake):
+    user = fake.profiles[1]
+    cid = fake.tables["challenges"][0]["id"]
+
+    async def scenario(client):
+        before = await client.post(f"/me/challenges/{cid}/proof/upload-url", json={"filename": "a.png"}, headers=bearer(user))
+        await client.post(f"/me/challenges/{cid}/enroll", headers=bearer(user))
+        after = await client.post(f"/me/challenges/{cid}/proof/upload-url", json={"filename": "Foto.PNG"}, headers=bearer(user))
+        return before, after
+
+    before, after = api(scenario)
+    assert before.status_code == 404
+    assert after.status_code == 200
+    data = after.json()
+    assert data["bucket"] == "proofs"
+    assert data["path"].startswith(f"{user['id']}/{cid}/") and data["path"].endswith(".png")
+    assert data["token"] in data["signed_url"]
+
+
+def test_submit_requires_uploaded_object(api, fake):
+    user = fake.profiles[1]
+    cid = fake.tables["challenges"][0]["id"]
+
+    async def scenario(client):
+        await client.post(f"/me/challenges/{cid}/enroll", headers=bearer(user))
+        upload = (await client.post(f"/me/challenges/{cid}/proof/upload-url", json={"filename": "a.pdf"}, headers=bearer(user))).json()
+        missing = await client.post(f"/me/challenges/{cid}/proof", json={"proof_path": upload["path"]}, headers=bearer(user))
+        foreign = await client.post(f"/me/challenges/{cid}/proof",
+                                    json={"proof_path": f"{fake.profiles[2]['id']}/{cid}/x.pdf"}, headers=bearer(user))
+        async with httpx.AsyncClient(transport=fake.transport()) as browser:
+            put = await browser.put(upload["signed_url"], content=b"%PDF")
+        recorded = await client.post(f"/me/challenges/{cid}/proof", json={"proof_path": upload["path"]}, headers=bearer(user))
+        return missing, foreign, put, recorded, upload["path"]
+
+    missing, foreign, put, recorded, path = api(scenario)
+    assert missing.status_code == 400
+    assert foreign.status_code == 400
+    assert put.status_code == 200
+    assert recorded.status_code == 200
+    assert recorded.json()["status"] == "enviado" and recorded.json()["proof_path"] == path
+
+
+def test_batch_read_urls_with_one_missing_path(api, fake):
+    admin = fake.profiles[0]
+    fake.objects["proofs/u/c/ok.png"] = b"IMG"
+
+    async def scenario(client):
+        return await client.post("/admin/proofs/signed-urls", json={"paths": ["u/c/ok.png", "u/c/missing.png"]},
+                                 headers=bearer(admin))
+
+    res = api(scenario)
+    assert res.status_code == 200
+    urls = res.json()
+    assert urls["u/c/missing.png"] is None
+    assert urls["u/c/ok.png"].startswith("http://supabase.test.local/storage/v1/object/sign/proofs/u/c/ok.png")
+
+
+def test_exists_only_treats_404_as_missing(api, fake, monkeypatch):
+    import proof_storage
+    fake.objects["proofs/u/c/ok.png"] = b"IMG"
+    assert api(lambda client: proof_storage.exists("u/c/ok.png")) is True
+    assert api(lambda client: proof_storage.exists("u/c/missing.png")) is False
+
+    # 403/5xx não são "não existe"
+    async def unavailable(request):
+        return httpx.Response(503)
+    monkeypatch.setattr(fake, "handle", unavailable)
+    with pytest.raises(httpx.HTTPStatusError):
+        api(lambda client: proof_storage.exists("u/c/ok.png"))
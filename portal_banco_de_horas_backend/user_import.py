@@ -0,0 +1,180 @@
+# Ficheiro: user_import.py
+# Importação de utilizadores em lote (CSV ou JSON) para o onboarding de equipas.
+#
+# 1. valida cada linha (os erros ficam na linha, não abortam o ficheiro);
+# 2. ignora os emails que já têm perfil: repetir o mesmo ficheiro é seguro;
+# 3. cria os utilizadores no Auth com concorrência limitada (bulk.run_bounded);
+# 4. grava perfis e saldos de férias em lotes (upsert que ignora duplicados).
+# Um utilizador que ficou criado no Auth sem perfil (falha a meio) é recuperado
+# na execução seguinte em vez de dar "email já registado".
+# Requer SUPABASE_SERVICE_ROLE_KEY: a API de admin do Auth recusa a chave anon.
+
+import csv
+import io
+import json
+from typing import Dict, List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
+from supabase_auth.errors import AuthApiError
+
+import auth
+import leaderboard
+from bulk import run_bounded
+from models import AdminImportUser, UserImportResult
+from settings import settings
+from supabase_client import supabase
+
+router = APIRouter(prefix="/admin/users", tags=["Admin"], dependencies=[Depends(auth.get_current_admin_user)])
+
+# Cabeçalhos aceites no CSV (também em português) -> campo do modelo
+_CSV_COLUMNS = {
+    "email": "email", "name": "name", "nome": "name", "password": "password", "senha": "password",
+    "role": "role", "cargo": "role", "vacation_days": "vacation_days", "dias_ferias": "vacation_days",
+}
+
+
+def _parse_csv(body: bytes) -> List[dict]:
+    reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+    rows = []
+    for raw in reader:
+        row = {}
+        for column, value in raw.items():
+            field = _CSV_COLUMNS.get((column or "").strip().lower())
+            if field and value is not None and value.strip() != "":
+                row[field] = value.strip()
+        rows.append(row)
+    return rows
+
+
+def _parse_body(body: bytes, content_type: str) -> List[dict]:
+    try:
+        if "csv" in content_type:
+            return _parse_csv(body)
+        data = json.loads(body or b"[]")
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(status_code=400, detail="Ficheiro inválido: envie CSV (text/csv) ou JSON.")
+    if isinstance(data, dict):
+        data = data.get("users")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="O JSON deve ser uma lista de utilizadores ou {\"users\": [...]}.")
+    return [r if isinstance(r, dict) else {} for r in data]
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _email_exists(e: AuthApiError) -> bool:
+    return getattr(e, "code", None) == "email_exists" or "already been registered" in str(e)
+
+
+async def _auth_ids_by_email(emails: set) -> Dict[str, str]:
+    """ Procura no Auth (página a página) os ids destes emails. Só usado para recuperar falhas anteriores. """
+    found: Dict[str, str] = {}
+    page = 1
+    while len(found) < len(emails):
+        users = await supabase.service_auth.admin.list_users(page=page, per_page=1000)
+        for u in users:
+            if u.email and u.email.lower() in emails:
+                found[u.email.lower()] = str(u.id)
+        if len(users) < 1000:
+            break
+        page += 1
+    return found
+
+
+@router.post("/import", response_model=List[UserImportResult])
+async def import_users(request: Request):
+    """
+    Importa utilizadores de um CSV (email,name,password,role,vacation_days) ou de
+    um JSON (lista ou {"users": [...]}). Devolve o resultado de cada linha.
+    """
+    if not settings.SUPABASE_SERVICE_ROLE_KEY:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Importação indisponível: configure SUPABASE_SERVICE_ROLE_KEY no servidor.")
+    rows = _parse_body(await request.body(), request.headers.get("content-type", ""))
+    if not rows:
+        raise HTTPException(status_code=400, detail="Nenhuma linha para importar.")
+    if len(rows) > settings.IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Máximo de {settings.IMPORT_MAX_ROWS} linhas por importação.")
+
+    results: List[UserImportResult] = []
+    valid: Dict[str, tuple] = {}  # email -> (índice do resultado, utilizador)
+    for n, raw in enumerate(rows, start=1):
+        try:
+            user = AdminImportUser.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append(UserImportResult(row=n, email=raw.get("email"), status="erro", error=error))
+            continue
+        email = user.email.lower()
+        if email in valid:
+            results.append(UserImportResult(row=n, email=email, status="erro", error="Email repetido no ficheiro."))
+            continue
+        results.append(UserImportResult(row=n, email=email, status="pendente"))
+        valid[email] = (len(results) - 1, user)
+
+    # Quem já tem perfil fica como está (reimportar o mesmo ficheiro não cria nada)
+    for emails in _chunks(list(valid), settings.IMPORT_CHUNK_SIZE):
+        res = await supabase.table('profiles').select('id, email').in_('email', emails).execute()
+        for profile in res.data:
+            entry = valid.pop((profile.get('email') or "").lower(), None)
+            if entry is not None:
+                results[entry[0]].status, results[entry[0]].user_id = "existente", UUID(profile['id'])
+
+    async def create(entry: tuple) -> UserImportResult:
+        index, user = entry
+        result = results[index]
+        try:
+            created = await supabase.service_auth.admin.create_user({
+                "email": result.email,
+                "password": user.password,
+                "email_confirm": True,
+                "user_metadata": {"name": user.name},
+            })
+            result.user_id = UUID(created.user.id)
+        except AuthApiError as e:
+            if not _email_exists(e):
+                result.status, result.error = "erro", str(e)
+        except Exception as e:
+            result.status, result.error = "erro", str(e)
+        return result
+
+    await run_bounded(list(valid.values()), create)
+
+    # Criados no Auth numa importação anterior que falhou antes do perfil
+    orphans = {email for email, (i, _) in valid.items() if results[i].status == "pendente" and results[i].user_id is None}
+    if orphans:
+        ids = await _auth_ids_by_email(orphans)
+        for email in orphans:
+            result = results[valid[email][0]]
+            if email in ids:
+                result.user_id = UUID(ids[email])
+            else:
+                result.status, result.error = "erro", "Email já registado no Auth."
+
+    # Perfis e saldos em lotes; uma falha só afeta as linhas do lote
+    pending = [(results[i], user) for i, user in valid.values() if results[i].status == "pendente"]
+    for chunk in _chunks(pending, settings.IMPORT_CHUNK_SIZE):
+        profiles = [{
+            "id": str(r.user_id), "name": u.name, "role": u.role, "points": 0, "hours": 0, "email": r.email,
+        } for r, u in chunk]
+        balances = [{"user_id": str(r.user_id), "days": u.vacation_days} for r, u in chunk]
+        try:
+            res = await supabase.table('profiles').upsert(profiles, on_conflict='id', ignore_duplicates=True).execute()
+            await supabase.table('vacation_balances').upsert(balances, on_conflict='user_id', ignore_duplicates=True).execute()
+        except Exception as e:
+            for r, _ in chunk:
+                r.status, r.error = "erro", f"Utilizador criado no Auth mas o perfil falhou (repita a importação): {e}"
+            continue
+        # Só as linhas realmente inseridas voltam; as outras já tinham perfil
+        inserted = {str(p['id']) for p in res.data}
+        for (r, _), profile in zip(chunk, profiles):
+            r.status = "criado" if profile['id'] in inserted else "existente"
+            leaderboard.ranking.update(profile)
+
+    return results
@@ -2,25 +2,51 @@
 import React, { useState, useEffect } from 'react';
 import { admin } from './api.js';
 
+// Totais já agregados no servidor (uma linha por desafio); o detalhe por cargo só é pedido ao abrir
+const percent = (rate) => rate == null ? '-' : `${(rate * 100).toFixed(1)}%`;
+
 const AdminChallengeReport = () => {
     const [data, setData] = useState([]);
-    useEffect(() => { admin.getAllParticipations().then(res => setData(res.data)); }, []);
+    const [openId, setOpenId] = useState(null);
+    const [detail, setDetail] = useState(null);
+    useEffect(() => { admin.getChallengesReport().then(res => setData(res.data)); }, []);
+
+    const toggle = (id) => {
+        if (openId === id) { setOpenId(null); setDetail(null); return; }
+        setOpenId(id); setDetail(null);
+        admin.getChallengeReport(id).then(res => setDetail(res.data));
+    };
 
     return (
         <div className="theme-card mt-4">
             <h2 className="text-lg font-bold mb-4 text-slate-800 dark:text-white">Relatório Geral</h2>
             <div className="overflow-x-auto">
                 <table className="w-full text-left">
-                    <thead><tr><th className="theme-table-head">Nome</th><th className="theme-table-head">Desafio</th><th className="theme-table-head">Status</th><th className="theme-table-head">Data</th><th className="theme-table-head">Prova</th></tr></thead>
+                    <thead><tr><th className="theme-table-head">Desafio</th><th className="theme-table-head">Inscritos</th><th className="theme-table-head">Enviados</th><th className="theme-table-head">Validados</th><th className="theme-table-head">Recusados</th><th className="theme-table-head">Pontos</th><th className="theme-table-head">Conclusão</th></tr></thead>
                     <tbody>
                         {data.map(d => (
-                            <tr key={d.id} className="theme-table-row">
-                                <td className="theme-table-cell">{d.profiles?.name}</td>
-                                <td className="theme-table-cell">{d.challenges?.title}</td>
-                                <td className="theme-table-cell"><span className="tag tag-default">{d.status}</span></td>
-                                <td className="theme-table-cell">{new Date(d.created_at).toLocaleDateString()}</td>
-                                <td className="theme-table-cell">{d.proof_url ? <a href={d.proof_url} target="_blank" className="text-blue-500 hover:underline">Ver Link</a> : '-'}</td>
-                            </tr>
+                            <React.Fragment key={d.challenge_id}>
+                                <tr className="theme-table-row cursor-pointer" onClick={() => toggle(d.challenge_id)}>
+                                    <td className="theme-table-cell font-bold">{d.title}</td>
+                                    <td className="theme-table-cell">{d.total}</td>
+                                    <td className="theme-table-cell">{d.enviado}</td>
+                                    <td className="theme-table-cell">{d.validado}</td>
+                                    <td className="theme-table-cell">{d.recusado}</td>
+                                    <td className="theme-table-cell">{d.points_awarded}</td>
+                                    <td className="theme-table-cell"><span className="tag tag-default">{percent(d.completion_rate)}</span></td>
+                                </tr>
+                                {openId === d.challenge_id && (detail ? detail.by_role : []).map(r => (
+                                    <tr key={`${d.challenge_id}-${r.role}`} className="theme-table-row text-sm text-slate-500">
+                                        <td className="theme-table-cell pl-8">{r.role || '-'}</td>
+                                        <td className="theme-table-cell">{r.total}</td>
+                                        <td className="theme-table-cell">{r.enviado}</td>
+                                        <td className="theme-table-cell">{r.validado}</td>
+                                        <td className="theme-table-cell">{r.recusado}</td>
+                                        <td className="theme-table-cell">{r.points_awarded}</td>
+                                        <td className="theme-table-cell">{percent(r.completion_rate)}</td>
+                                    </tr>
+                                ))}
+                            </React.Fragment>
                         ))}
                     </tbody>
                 </table>
@@ -28,4 +54,4 @@ const AdminChallengeReport = () => {
         </div>
     );
 };
-export default AdminChallengeReport;
\ No newline at end of file
+export default AdminChallengeReport;
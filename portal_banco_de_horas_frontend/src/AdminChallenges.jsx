@@ -1,27 +1,32 @@
 // src/AdminChallenges.jsx
 import React, { useState, useEffect } from 'react';
 import { Swords, Plus, Trash2, X, Users, ArrowLeft } from "lucide-react";
-import { admin, challenge, getPublicRoles } from './api'; // Importar getPublicRoles
+import { admin, getPublicRoles } from './api'; // Importar getPublicRoles
+import LoadMore, { usePagedList } from './LoadMore.jsx';
 
 const AdminChallenges = () => {
   const [form, setForm] = useState({ title: "", description: "", points: 10, allowed_roles: [], due_at: "" });
   const [existingChallenges, setExistingChallenges] = useState([]);
   const [availableRoles, setAvailableRoles] = useState([]); // Cargos vindos do DB
-  const [participations, setParticipations] = useState([]);
+  const [counts, setCounts] = useState({}); // challenge_id -> total de inscritos (agregado no servidor)
   const [viewMembersOf, setViewMembersOf] = useState(null);
   const [loading, setLoading] = useState(false);
 
   const fetchData = async () => {
       try {
-          const [cRes, rRes, pRes] = await Promise.all([challenge.getAll(), getPublicRoles(), admin.getAllParticipations()]);
+          const [cRes, rRes, repRes] = await Promise.all([admin.getChallenges(), getPublicRoles(), admin.getChallengesReport()]);
           setExistingChallenges(cRes.data);
           setAvailableRoles(rRes.data);
-          setParticipations(pRes.data);
+          setCounts(Object.fromEntries(repRes.data.map(r => [r.challenge_id, r.total])));
       } catch (e) { console.error(e); }
   };
 
   useEffect(() => { fetchData(); }, []);
 
+  // Só os inscritos do desafio aberto, pedidos quando o admin o abre (paginados)
+  const membersList = usePagedList(viewMembersOf && (p => admin.getAllParticipations({ ...p, challenge_id: viewMembersOf.id })), [viewMembersOf]);
+  const members = membersList.rows;
+
   const addRole = (role) => {
     if (!role) return;
     if (!form.allowed_roles.includes(role)) setForm({ ...form, allowed_roles: [...form.allowed_roles, role] });
@@ -40,7 +45,7 @@ const AdminChallenges = () => {
   const handleDelete = async (id) => { if(confirm("Excluir?")) { await admin.deleteChallenge(id); fetchData(); } };
 
   if (viewMembersOf) {
-      const parts = participations.filter(p => p.challenge_id === viewMembersOf.id);
+      const parts = members;
       return (
         <div className="space-y-6 animate-in fade-in duration-500 mt-4">
             <button onClick={() => setViewMembersOf(null)} className="flex items-center gap-2 text-emerald-600 hover:text-emerald-700 font-bold mb-2 transition-colors">
@@ -75,6 +80,7 @@ const AdminChallenges = () => {
                        </tbody>
                    </table>
                </div>
+               <LoadMore list={membersList} />
             </div>
         </div>
       );
@@ -134,7 +140,7 @@ const AdminChallenges = () => {
                                 <td className="theme-table-cell text-xs">{c.allowed_roles?.join(', ') || 'Todos'}</td>
                                 <td className="theme-table-cell">
                                     {(() => {
-                                        const pCount = participations.filter(p => p.challenge_id === c.id).length;
+                                        const pCount = counts[c.id] || 0;
                                         return pCount > 0 ? (
                                             <button onClick={() => setViewMembersOf(c)} className="text-emerald-600 dark:text-emerald-400 font-bold hover:underline flex items-center gap-1">
                                                 <Users size={14}/> {pCount} inscrito(s)
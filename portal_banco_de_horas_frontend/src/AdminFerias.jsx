@@ -1,10 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import { Plane, Plus, Minus, History, Users, Trash2 } from 'lucide-react';
-import { ferias, admin } from './api'; // Ajuste os imports conforme necessário
+import { ferias, admin, fetchAllPages } from './api'; // Ajuste os imports conforme necessário
+import LoadMore, { usePagedList } from './LoadMore.jsx';
 
 const AdminFerias = () => {
   const [usuarios, setUsuarios] = useState([]);
-  const [relatorio, setRelatorio] = useState([]);
+  // Relatório paginado ("Carregar mais"); os selects precisam de todos os utilizadores
+  const relatorioList = usePagedList(ferias.getRelatorio);
+  const relatorio = relatorioList.rows;
   const [loading, setLoading] = useState(false);
 
   // Estados para os formulários
@@ -15,17 +18,14 @@ const AdminFerias = () => {
   const carregarDados = async () => {
     try {
       // Supondo que você tem uma função para pegar todos os usuários para o select
-      const resUsuarios = await admin.getAllUsers(); 
-      setUsuarios(resUsuarios.data);
-
-      const resRelatorio = await ferias.getRelatorio();
-      setRelatorio(resRelatorio.data);
+      setUsuarios(await fetchAllPages(admin.getAllUsers));
+      await relatorioList.reload();
     } catch (error) {
       console.error("Erro ao carregar dados:", error);
     }
   };
 
-  useEffect(() => { carregarDados(); }, []);
+  useEffect(() => { fetchAllPages(admin.getAllUsers).then(setUsuarios).catch(console.error); }, []);
 
   // Função para enviar o ajuste de saldo
   const handleAjustarSaldo = async (e) => {
@@ -74,7 +74,8 @@ const AdminFerias = () => {
       setFormHistorico({ user_id: '', start_date: '', end_date: '', notes: '' });
       carregarDados(); // Atualiza a tabela
     } catch (error) {
-      alert("Erro ao registar férias.");
+      // 409 = sobreposição com outras férias do mesmo funcionário
+      alert(error.response?.data?.detail || "Erro ao registar férias.");
     } finally {
       setLoading(false);
     }
@@ -190,6 +191,7 @@ const AdminFerias = () => {
             </tbody>
           </table>
         </div>
+        <LoadMore list={relatorioList} />
       </div>
 
     </div>
@@ -3,9 +3,11 @@ import React, { useState, useEffect } from 'react';
 import { Users, Edit2, Save, X, KeyRound, Trash2, Eye, Clock } from "lucide-react";
 import { admin, getPublicRoles } from './api';
 import AdminUserDetails from './AdminUserDetails.jsx';
+import LoadMore, { usePagedList } from './LoadMore.jsx';
 
 const AdminUsers = () => {
-  const [users, setUsers] = useState([]);
+  const usersList = usePagedList(admin.getAllUsers);
+  const users = usersList.rows;
   const [rolesList, setRolesList] = useState([]);
   const [selectedUser, setSelectedUser] = useState(null);
 
@@ -13,15 +15,9 @@ const AdminUsers = () => {
   const [editForm, setEditForm] = useState({});
   const [loading, setLoading] = useState(false);
 
-  const fetchData = async () => {
-    try {
-      const [uRes, rRes] = await Promise.all([admin.getAllUsers(), getPublicRoles()]);
-      setUsers(uRes.data);
-      setRolesList(rRes.data);
-    } catch (e) { console.error("Erro ao buscar dados", e); }
-  };
+  const fetchData = usersList.reload;
 
-  useEffect(() => { fetchData(); }, []);
+  useEffect(() => { getPublicRoles().then(r => setRolesList(r.data)).catch(e => console.error("Erro ao buscar dados", e)); }, []);
 
   const startEdit = (user) => { setEditingId(user.id); setEditForm({ name: user.name, role: user.role, is_admin: user.is_admin }); };
 
@@ -13,7 +13,16 @@ const AdminValidation = () => {
     const [loading, setLoading] = useState(false);
     const [message, setMessage] = useState(null);
 
-    const load = async () => { try { const r = await admin.getPendingValidations(); setList(r.data); } catch(e){} };
+    const [proofLinks, setProofLinks] = useState({});
+
+    // Provas em ficheiro: um só pedido assina os URLs de leitura de toda a lista
+    const load = async () => {
+        try {
+            const r = await admin.getPendingValidations(); setList(r.data);
+            const paths = r.data.map(p => p.proof_path).filter(Boolean);
+            if (paths.length) { const u = await admin.getProofUrls(paths); setProofLinks(u.data); }
+        } catch(e){}
+    };
     useEffect(() => { load(); }, []);
 
     const validate = async (id, ok) => {
@@ -46,7 +55,11 @@ const AdminValidation = () => {
                                 Servidor: <b>{p.profiles?.name}</b> • <span className="opacity-80">{p.profiles?.role}</span>
                             </div>
                             <div className="mt-1">
-                                {p.proof_url ? (
+                                {p.proof_path ? (
+                                    proofLinks[p.proof_path]
+                                        ? <a href={proofLinks[p.proof_path]} target="_blank" rel="noreferrer" className="text-xs text-blue-600 dark:text-blue-400 hover:underline font-medium">Ver Prova (Ficheiro)</a>
+                                        : <span className="text-xs text-red-400">Ficheiro indisponível</span>
+                                ) : p.proof_url ? (
                                     <a href={p.proof_url} target="_blank" rel="noreferrer" className="text-xs text-blue-600 dark:text-blue-400 hover:underline font-medium">Ver Prova (Link)</a>
                                 ) : <span className="text-xs text-red-400">Sem link</span>}
                             </div>
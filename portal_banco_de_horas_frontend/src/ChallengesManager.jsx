@@ -1,7 +1,7 @@
 // src/ChallengesManager.jsx
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Swords, Users, Upload, CheckCircle, Clock } from "lucide-react";
-import { challenge, user } from './api.js';
+import { challenge } from './api.js';
 
 // --- UI Components (Adaptados ao Tema Claro/Escuro) ---
 
@@ -34,49 +34,28 @@ function formatDuration(d) { return d ? new Date(d).toLocaleDateString() : "Sem
 
 // --- Componente Principal ---
 
-const ChallengesManager = ({ currentUser }) => {
-  const [challenges, setChallenges] = useState([]);
-  const [participations, setParticipations] = useState([]); 
+// Desafios e participações vêm do Dashboard (/me/dashboard); `onChange` volta a carregá-los
+const ChallengesManager = ({ challenges, participations, onChange }) => {
   const [proofUrl, setProofUrl] = useState({});
+  const [proofFile, setProofFile] = useState({});
   const [loading, setLoading] = useState(false);
 
-  const fetchData = async () => {
-    try {
-      const [chalRes, partRes] = await Promise.all([
-        challenge.getAll(),
-        user.getParticipations()
-      ]);
-
-      const allChallenges = chalRes.data;
-      const myParts = partRes.data;
-
-      const visible = allChallenges.filter(c => {
-        const roles = c.allowed_roles || [];
-        const ids = c.allowed_user_ids || [];
-        if (roles.length === 0 && ids.length === 0) return true;
-        return roles.includes(currentUser.role) || ids.includes(currentUser.id);
-      });
-
-      setChallenges(visible);
-      setParticipations(myParts); 
-
-    } catch (e) { console.error(e); }
-  };
-
-  useEffect(() => { fetchData(); }, [currentUser]);
-
   const handleEnroll = async (cid) => {
     setLoading(true);
-    try { await challenge.enroll(cid); await fetchData(); alert("Inscrição realizada!"); } 
+    try { await challenge.enroll(cid); await onChange(); alert("Inscrição realizada!"); } 
     catch (e) { alert("Erro ao inscrever"); }
     finally { setLoading(false); }
   };
 
   const handleProof = async (cid) => {
-    if(!proofUrl[cid]) return alert("Cole o link!");
+    if(!proofUrl[cid] && !proofFile[cid]) return alert("Cole o link ou escolha um ficheiro!");
     setLoading(true);
-    try { await challenge.submitProof(cid, proofUrl[cid]); await fetchData(); alert("Prova enviada!"); } 
-    catch (e) { alert("Erro ao enviar"); }
+    try {
+      // Ficheiro: vai diretamente para o Storage e só o caminho passa pela API
+      const proof = proofFile[cid] ? { proof_path: await challenge.uploadProofFile(cid, proofFile[cid]) } : { proof_url: proofUrl[cid] };
+      await challenge.submitProof(cid, proof); await onChange(); alert("Prova enviada!");
+    }
+    catch (e) { alert(e.response?.data?.detail || "Erro ao enviar"); }
     finally { setLoading(false); }
   };
 
@@ -135,10 +114,15 @@ const ChallengesManager = ({ currentUser }) => {
                                     value={proofUrl[c.id] || ''}
                                     onChange={e => setProofUrl({...proofUrl, [c.id]: e.target.value})} 
                                 />
-                                <button onClick={() => handleProof(c.id)} className="bg-emerald-600 hover:bg-emerald-700 text-white px-3 rounded-lg text-xs font-bold">
+                                <button onClick={() => handleProof(c.id)} disabled={loading} className="bg-emerald-600 hover:bg-emerald-700 text-white px-3 rounded-lg text-xs font-bold disabled:opacity-50">
                                     Enviar
                                 </button>
                             </div>
+                            <label className="flex items-center gap-1 text-xs text-slate-500 dark:text-neutral-400 cursor-pointer">
+                                <Upload size={12}/> {proofFile[c.id] ? proofFile[c.id].name : "ou anexar ficheiro (imagem/PDF)"}
+                                <input type="file" accept="image/*,application/pdf" className="hidden"
+                                    onChange={e => setProofFile({...proofFile, [c.id]: e.target.files[0]})} />
+                            </label>
                           </div>
                       )}
 
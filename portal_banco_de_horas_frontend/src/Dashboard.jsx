@@ -13,6 +13,7 @@ import AdminChallenges from './AdminChallenges.jsx';
 import AdminChallengeReport from './AdminChallengeReport.jsx';
 import AdminSettings from './AdminSettings.jsx';
 import AdminUserCreate from './AdminUserCreate.jsx';
+import LoadMore, { usePagedList } from './LoadMore.jsx';
 
 // 2. Importamos os nossos novos componentes de Férias
 import FeriasCard from './FeriasCard.jsx'; // Verifique se a pasta está correta
@@ -123,29 +124,44 @@ function UserProfileCard({ currentUser }) {
 }
 
 // --- User Dashboard ---
+// Chave de idempotência de um formulário: a mesma enquanto o conteúdo não muda;
+// chamar a segunda função (renovar) depois de um envio com sucesso
+function useIdempotencyKey(deps) {
+  const [key, setKey] = useState(() => crypto.randomUUID());
+  useEffect(() => { setKey(crypto.randomUUID()); }, deps);
+  return [key, () => setKey(crypto.randomUUID())];
+}
+
 function UserDashboardContent({ currentUser, fetchProfile }) {
   const [req, setReq] = useState({ type: "gozo", amount: 1, unit: "days", reason: "" });
-  const [requests, setRequests] = useState([]);
+  // Um só pedido (/me/dashboard) para o ecrã: pedidos, desafios, participações, taxa e férias
+  const [dash, setDash] = useState(null);
   const [loading, setLoading] = useState(false);
-  const [rate, setRate] = useState(10);
   const [convH, setConvH] = useState(1);
+  const [converting, setConverting] = useState(false);
+  // Uma chave por envio: duplos cliques e novas tentativas não criam pedidos/conversões repetidos
+  const [reqKey, renewReqKey] = useIdempotencyKey([req]);
+  const [convKey, renewConvKey] = useIdempotencyKey([convH]);
+
+  const fetchDashboard = async () => { try { const r = await user.getDashboard(); setDash(r.data); } catch (e) {} };
 
-  const fetchRequests = async () => { try { const r = await user.getRequests(); setRequests(r.data); } catch (e) {} };
-  
-  useEffect(() => { 
-      fetchRequests(); 
-      const getSet = user.getSettings || admin.getSettings;
-      if(getSet) getSet().then(r => setRate(r.data.points_per_hour)).catch(()=>{});
-  }, []);
+  useEffect(() => { fetchDashboard(); }, [currentUser]);
+
+  const requests = dash?.requests || [];
+  const rate = dash?.settings?.points_per_hour ?? 10;
 
   const handleSubmit = async (e) => {
     e.preventDefault(); setLoading(true);
     const finalHours = req.unit === 'days' ? req.amount * 8 : req.amount;
-    try { await user.createRequest(req.type, finalHours, req.reason); fetchRequests(); setReq({ type: "gozo", amount: 1, unit: "days", reason: "" }); alert("Enviado!"); }
+    try { await user.createRequest(req.type, finalHours, req.reason, reqKey); renewReqKey(); fetchDashboard(); setReq({ type: "gozo", amount: 1, unit: "days", reason: "" }); alert("Enviado!"); }
     catch (e) { alert("Erro."); } finally { setLoading(false); }
   };
 
-  const handleConvert = async () => { try { await user.convertPoints(convH); await fetchProfile(); alert("Convertido!"); } catch(e){alert("Erro");} };
+  const handleConvert = async () => {
+    setConverting(true);
+    try { await user.convertPoints(convH, convKey); renewConvKey(); await fetchProfile(); alert("Convertido!"); }
+    catch(e){alert("Erro");} finally { setConverting(false); }
+  };
 
   const cost = convH * rate;
 
@@ -162,7 +178,7 @@ function UserDashboardContent({ currentUser, fetchProfile }) {
                 <div className="flex gap-3 items-end">
                     <div className="flex-1"><label className="text-xs font-bold text-slate-500 uppercase">Horas</label><input type="number" min={1} value={convH} onChange={(e)=>setConvH(+e.target.value)} className="theme-input"/></div>
                     <div className="pb-3 text-sm font-bold text-slate-700 dark:text-emerald-200">Custo: {cost} pts</div>
-                    <Button onClick={handleConvert} disabled={currentUser.points < cost} variant="success">Converter</Button>
+                    <Button onClick={handleConvert} disabled={converting || currentUser.points < cost} variant="success">Converter</Button>
                 </div>
             </Card>
             
@@ -191,7 +207,7 @@ function UserDashboardContent({ currentUser, fetchProfile }) {
 
         <div className="flex flex-col gap-6">
             {/* 3. Aqui está o nosso novo Card de Férias! */}
-            <FeriasCard userId={currentUser.id} />
+            <FeriasCard dias={dash?.vacation_days} loading={!dash} />
 
             <UserProfileCard currentUser={currentUser} />
 
@@ -214,7 +230,7 @@ function UserDashboardContent({ currentUser, fetchProfile }) {
             </Card>
         </div>
       </div>
-      <ChallengesManager currentUser={currentUser} />
+      <ChallengesManager challenges={dash?.challenges || []} participations={dash?.participations || []} onChange={fetchDashboard} />
     </div>
   );
 }
@@ -222,12 +238,12 @@ function UserDashboardContent({ currentUser, fetchProfile }) {
 // --- Admin Content ---
 function AdminDashboardContent({ currentUser, fetchProfile }) {
   const [activeTab, setActiveTab] = useState(localStorage.getItem('adminTab') || "requests");
-  const [requests, setRequests] = useState([]);
+  const requestsList = usePagedList(admin.getAllRequests);
+  const requests = requestsList.rows;
 
   useEffect(() => { localStorage.setItem('adminTab', activeTab); }, [activeTab]);
 
-  const fetchData = async () => { try { const r = await admin.getAllRequests(); setRequests(r.data); } catch (e) {} };
-  useEffect(() => { fetchData(); }, []);
+  const fetchData = requestsList.reload;
 
   const handleProcess = async (rid, status) => { try { await admin.processRequest(rid, status); fetchData(); } catch(e) { alert("Erro"); } };
 
@@ -292,6 +308,7 @@ function AdminDashboardContent({ currentUser, fetchProfile }) {
                         </tbody>
                     </table>
                 </div>
+                <LoadMore list={requestsList} />
             </Card>
             <AdminValidation />
         </div>
@@ -1,28 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Plane, Calendar } from 'lucide-react';
-import { ferias } from './api';
-
-const FeriasCard = ({ userId }) => {
-  const [dias, setDias] = useState(0);
-  const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    // Função para ir buscar o saldo assim que o componente aparece na tela
-    const carregarSaldo = async () => {
-      if (!userId) return;
-      try {
-        const response = await ferias.getSaldo(userId);
-        setDias(response.data.dias);
-      } catch (error) {
-        console.error("Erro ao carregar férias:", error);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    carregarSaldo();
-  }, [userId]);
 
+// O saldo chega com o resto do ecrã inicial (/me/dashboard, em Dashboard.jsx)
+const FeriasCard = ({ dias = 0, loading = false }) => {
   return (
     <div className="theme-card flex items-center justify-between p-6 bg-white dark:bg-neutral-900 rounded-2xl shadow-sm border border-slate-100 dark:border-neutral-800">
       <div>
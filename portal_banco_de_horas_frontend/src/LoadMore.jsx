@@ -0,0 +1,41 @@
+// src/LoadMore.jsx
+import React, { useState, useEffect } from 'react';
+import { nextCursor } from './api.js';
+
+// Lista paginada por cursor (listas do admin): a primeira página ao montar e quando
+// `deps` mudam, as seguintes com loadMore(); reload() volta à primeira (ex.: depois de editar).
+// Sem `fetchPage` (null) a lista fica vazia.
+export function usePagedList(fetchPage, deps = []) {
+  const [rows, setRows] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const reload = async () => {
+    if (!fetchPage) { setRows([]); setCursor(null); return; }
+    try { const res = await fetchPage({}); setRows(res.data); setCursor(nextCursor(res)); }
+    catch (e) { console.error(e); }
+  };
+
+  const loadMore = async () => {
+    if (!cursor) return;
+    setLoadingMore(true);
+    try { const res = await fetchPage({ cursor }); setRows(prev => [...prev, ...res.data]); setCursor(nextCursor(res)); }
+    catch (e) { console.error(e); }
+    finally { setLoadingMore(false); }
+  };
+
+  useEffect(() => { reload(); }, deps);
+
+  return { rows, hasMore: !!cursor, loadingMore, loadMore, reload };
+}
+
+// Botão "Carregar mais" de uma lista de usePagedList (só aparece se houver mais páginas)
+const LoadMore = ({ list }) => list.hasMore ? (
+  <div className="flex justify-center mt-4">
+    <button onClick={list.loadMore} disabled={list.loadingMore} className="btn-subtle">
+      {list.loadingMore ? 'A carregar...' : 'Carregar mais'}
+    </button>
+  </div>
+) : null;
+
+export default LoadMore;
@@ -5,6 +5,21 @@ import axios from 'axios';
 const API_URL = 'https://portal-backend-dtf6.onrender.com'; 
 const TOKEN_KEY = 'auth_token_14reg';
 
+// Listas do admin paginadas: o servidor devolve o cursor da página seguinte em X-Next-Cursor
+export const nextCursor = (res) => res.headers['x-next-cursor'] || null;
+
+// Todas as páginas de uma lista (para os selects que precisam de todos os utilizadores)
+export const fetchAllPages = async (fetchPage, params = {}) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const res = await fetchPage({ ...params, limit: 500, ...(cursor ? { cursor } : {}) });
+    rows.push(...res.data);
+    cursor = nextCursor(res);
+  } while (cursor);
+  return rows;
+};
+
 export const getToken = () => localStorage.getItem(TOKEN_KEY);
 export const setToken = (token) => localStorage.setItem(TOKEN_KEY, token);
 export const clearToken = () => localStorage.removeItem(TOKEN_KEY);
@@ -32,42 +47,80 @@ export const ferias = {
   // Rotas do Admin
   ajustarSaldo: (dados) => api.post('/ferias/admin/ajustar-saldo', dados),
   registrarHistorico: (dados) => api.post('/ferias/admin/historico', dados),
-  getRelatorio: () => api.get('/ferias/admin/relatorio'),
+  getRelatorio: (params) => api.get('/ferias/admin/relatorio', { params }),
+  exportRelatorio: (formato = 'csv', params) => api.get('/ferias/admin/relatorio/export', { params: { ...params, formato }, responseType: 'blob' }),
   deleteHistorico: (id) => api.delete(`/ferias/admin/historico/${id}`),
+  getAusentes: (data_inicio, data_fim, role) => api.get('/ferias/admin/ausentes', { params: { data_inicio, data_fim, role } }),
+  getCobertura: (data_inicio, data_fim, role) => api.get('/ferias/admin/cobertura', { params: { data_inicio, data_fim, role } }),
 };
 
 export const user = {
   getProfile: () => api.get('/me'),
+  getDashboard: () => api.get('/me/dashboard'),
   getRequests: () => api.get('/me/requests'),
-  createRequest: (type, hours, reason) => api.post('/me/requests', { type, hours, reason }),
-  convertPoints: (hours) => api.post('/me/convert', { hours }),
+  // Idempotency-Key: uma chave por envio do formulário (Dashboard.jsx), reutilizada em
+  // duplos cliques e novas tentativas; com a mesma chave o servidor não cria um segundo pedido
+  createRequest: (type, hours, reason, key) => api.post('/me/requests', { type, hours, reason }, { headers: { 'Idempotency-Key': key } }),
+  convertPoints: (hours, key) => api.post('/me/convert', { hours }, { headers: { 'Idempotency-Key': key } }),
   getParticipations: () => api.get('/me/participations'),
   getSettings: () => api.get('/me/settings'),
   updatePassword: (password) => api.put('/me/password', { password }),
+  getLeaderboard: (params) => api.get('/leaderboard', { params }),
 };
 
 export const challenge = {
-  getAll: () => api.get('/challenges'),
+  getMine: () => api.get('/me/challenges'),
   enroll: (challenge_id) => api.post(`/me/challenges/${challenge_id}/enroll`),
-  submitProof: (challenge_id, proof_url) => api.post(`/me/challenges/${challenge_id}/proof`, { proof_url }),
+  // proof: { proof_url } (link) ou { proof_path } (ficheiro já enviado com uploadProofFile)
+  submitProof: (challenge_id, proof) => api.post(`/me/challenges/${challenge_id}/proof`, typeof proof === 'string' ? { proof_url: proof } : proof),
+  getProofUploadUrl: (challenge_id, filename) => api.post(`/me/challenges/${challenge_id}/proof/upload-url`, { filename }),
+  // O ficheiro vai diretamente para o Storage (URL assinado); devolve o path a enviar em submitProof
+  uploadProofFile: async (challenge_id, file) => {
+    const { data } = await challenge.getProofUploadUrl(challenge_id, file.name);
+    await axios.put(data.signed_url, file, { headers: { 'Content-Type': file.type || 'application/octet-stream' } });
+    return data.path;
+  },
 };
 
 export const admin = {
   getSettings: () => api.get('/admin/settings'),
   updateSettings: (points_per_hour) => api.put('/admin/settings', { points_per_hour }),
-  getAllRequests: () => api.get('/admin/requests'), 
+  getAllRequests: (params) => api.get('/admin/requests', { params }), 
   processRequest: (request_id, status) => api.post(`/admin/requests/${request_id}/process`, { status }),
+  processRequests: (items) => api.post('/admin/requests/process', { items }),
+  getChallenges: () => api.get('/admin/challenges'),
   createChallenge: (data) => api.post('/admin/challenges', data),
   deleteChallenge: (challenge_id) => api.delete(`/admin/challenges/${challenge_id}`),
   getPendingValidations: () => api.get('/admin/participants/pending'),
-  getAllParticipations: () => api.get('/admin/participants/all'),
+  getAllParticipations: (params) => api.get('/admin/participants/all', { params }),
+  getChallengesReport: () => api.get('/admin/challenges/report'),
+  getChallengeReport: (id) => api.get(`/admin/challenges/${id}/report`),
+  exportParticipations: (format = 'csv', params) => api.get('/admin/participants/export', { params: { ...params, format }, responseType: 'blob' }),
+  // path -> URL de leitura temporário (provas enviadas como ficheiro)
+  getProofUrls: (paths) => api.post('/admin/proofs/signed-urls', { paths }),
   validateParticipant: (participant_id, approved) => api.post(`/admin/participants/${participant_id}/validate`, { approved }),
-  getAllUsers: () => api.get('/admin/users'),
+  validateParticipants: (items) => api.post('/admin/participants/validate', { items }),
+  getAllUsers: (params) => api.get('/admin/users', { params }),
+  // data: texto CSV (format 'csv') ou lista de utilizadores; devolve o resultado de cada linha
+  importUsers: (data, format = 'json') => api.post('/admin/users/import', data, { headers: { 'Content-Type': format === 'csv' ? 'text/csv' : 'application/json' } }),
+  // Reenviar o 'cursor' da resposta anterior (vazio na primeira vez) enquanto has_more
+  syncRequests: (cursor) => api.get('/admin/sync/requests', { params: { cursor } }),
+  syncParticipants: (cursor) => api.get('/admin/sync/participants', { params: { cursor } }),
+  syncUsers: (cursor) => api.get('/admin/sync/users', { params: { cursor } }),
+  // EventSource não envia cabeçalhos: vai na query um bilhete de uso único (nunca o token da sessão).
+  // Eventos 'requests' e 'participants'; em 'error' fechar e chamar de novo (novo bilhete)
+  subscribeEvents: async () => {
+    const { data } = await api.post('/admin/events/ticket');
+    return new EventSource(`${API_URL}/admin/events?ticket=${encodeURIComponent(data.ticket)}`);
+  },
   updateUser: (user_id, data) => api.put(`/admin/users/${user_id}`, data),
   deleteUser: (user_id) => api.delete(`/admin/users/${user_id}`),
   resetPassword: (user_id, new_password) => api.post(`/admin/users/${user_id}/reset_password`, { new_password }),
   getUserRequests: (user_id) => api.get(`/admin/users/${user_id}/requests`),
   adjustUserHours: (user_id, hours, reason) => api.post(`/admin/users/${user_id}/adjust`, { hours, reason }),
+  getBalanceAsOf: (user_id, at) => api.get(`/admin/ledger/${user_id}/balance`, { params: { at } }),
+  getStatement: (user_id, params) => api.get(`/admin/ledger/${user_id}/statement`, { params }),
+  reconcileBalances: () => api.get('/admin/ledger/reconcile'),
   addRole: (name) => api.post('/admin/roles', { name }),
   deleteRole: (id) => api.delete(`/admin/roles/${id}`),
 };